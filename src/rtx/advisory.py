@@ -1,25 +1,41 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
 import os
 import re
+import sqlite3
+import threading
+import time
 from collections import OrderedDict
-from collections.abc import Iterable, Mapping
-from itertools import chain
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import replace
+from functools import lru_cache, partial
+from itertools import chain, repeat
+from operator import attrgetter
+from pathlib import Path
 from types import TracebackType
-from typing import Any, cast
+from typing import TypeVar
 
 import httpx
+from packaging.version import InvalidVersion, Version
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - optional accelerator
+    ijson = None
 
 from rtx import config
 from rtx.exceptions import AdvisoryServiceError
 from rtx.models import SEVERITY_RANK, Advisory, Dependency, Severity
 from rtx.utils import (
     AsyncRetry,
+    build_http_client,
     chunked,
     env_flag,
     is_non_string_sequence,
+    safe_json_loads,
     unique_preserving_order,
 )
 
@@ -48,54 +64,117 @@ OSV_SUPPORTED_ECOSYSTEMS = {
     "crates.io",
 }
 
+# rtx (or already-OSV) ecosystem name -> OSV query name, for supported ecosystems only.
+_OSV_QUERY_ECOSYSTEMS: dict[str, str] = {
+    ecosystem: osv_name
+    for ecosystem in OSV_ECOSYSTEM_MAP.keys() | OSV_SUPPORTED_ECOSYSTEMS
+    if (osv_name := OSV_ECOSYSTEM_MAP.get(ecosystem, ecosystem)) in OSV_SUPPORTED_ECOSYSTEMS
+}
+
+# rtx ecosystem name -> GitHub ``SecurityAdvisoryEcosystem`` enum value. Packages
+# outside this map are never sent: one invalid enum variable fails the whole batch.
+GITHUB_ECOSYSTEM_MAP: dict[str, str] = {
+    "pypi": "PIP",
+    "npm": "NPM",
+    "maven": "MAVEN",
+    "go": "GO",
+    "crates": "RUST",
+    "packagist": "COMPOSER",
+    "nuget": "NUGET",
+    "rubygems": "RUBYGEMS",
+}
+
 logger = logging.getLogger(__name__)
 
+K = TypeVar("K")
+V = TypeVar("V")
+
+# GitHub advisories paired with their ``vulnerableVersionRange``.
+_RangedAdvisories = list[tuple[Advisory, str | None]]
+
+
+class _AbandonedLookup(Exception):
+    """The caller that owned a shared OSV lookup was cancelled before it finished."""
+
+
+def _stream_osv_results(content: bytes) -> Iterator[object]:
+    # ijson reports malformed input lazily and with its own exception type;
+    # surface it as the JSONDecodeError safe_json_loads raises for the same body.
+    try:
+        yield from ijson.items(content, "results.item", use_float=True)
+    except ijson.JSONError as exc:
+        raise json.JSONDecodeError(str(exc), content.decode("utf-8", "replace"), 0) from exc
+
+
+def _iter_osv_results(response: httpx.Response) -> Iterator[object]:
+    """Yield OSV ``results`` entries, streaming large or opted-in payloads with ijson."""
+
+    content = response.content
+    threshold = config.JSON_STREAMING_THRESHOLD
+    if ijson is not None and (
+        config.JSON_STREAMING or (threshold > 0 and len(content) >= threshold)
+    ):
+        return _stream_osv_results(content)
+    payload = safe_json_loads(content)
+    results = payload.get("results") if isinstance(payload, Mapping) else None
+    return iter(results) if is_non_string_sequence(results) else iter(())
+
+
+_NUMERIC_SCORE = re.compile(r"\d+(?:\.\d+)?")
+
 
 def _extract_numeric_score(raw: object) -> float:
+    if isinstance(raw, bool):
+        return 0.0
     if isinstance(raw, int | float):
         return float(raw)
     if isinstance(raw, str):
         stripped = raw.strip()
+        # OSV mostly reports CVSS vectors, which never parse as floats; skip the
+        # raised ValueError and the regex scan for them.
+        if stripped.startswith("CVSS:"):
+            return 0.0
         try:
             return float(stripped)
         except ValueError:
-            if stripped.startswith("CVSS:"):
-                return 0.0
-            match = re.search(r"\d+(?:\.\d+)?", stripped)
-            if match:
-                try:
-                    return float(match.group(0))
-                except ValueError:
-                    return 0.0
+            match = _NUMERIC_SCORE.search(stripped)
+            return float(match.group(0)) if match else 0.0
     return 0.0
 
 
+_SEVERITY_LABELS: dict[str, Severity] = {
+    "critical": Severity.CRITICAL,
+    "high": Severity.HIGH,
+    "medium": Severity.MEDIUM,
+    "moderate": Severity.MEDIUM,
+    "low": Severity.LOW,
+}
+# GitHub and OSV report upper-case labels; matching those spellings directly
+# skips the strip/lower allocations for nearly every lookup.
+_SEVERITY_LABELS.update({label.upper(): severity for label, severity in _SEVERITY_LABELS.items()})
+
+
+def _lookup_severity_label(label: str, default: Severity) -> Severity:
+    severity = _SEVERITY_LABELS.get(label)
+    if severity is None:
+        severity = _SEVERITY_LABELS.get(label.strip().lower(), default)
+    return severity
+
+
+# Labels come from a small vocabulary, so memoizing the pure mappers turns
+# repeated spellings (e.g. " Moderate ") into a single cache probe.
+@lru_cache(maxsize=64)
 def _severity_from_label(label: str | None) -> Severity:
     if not label:
         return Severity.NONE
-    normalized = label.strip().lower()
-    mapping = {
-        "critical": Severity.CRITICAL,
-        "high": Severity.HIGH,
-        "medium": Severity.MEDIUM,
-        "moderate": Severity.MEDIUM,
-        "low": Severity.LOW,
-    }
-    return mapping.get(normalized, Severity.NONE)
+    return _lookup_severity_label(label, Severity.NONE)
 
 
+@lru_cache(maxsize=64)
 def _severity_from_github(label: str | None) -> Severity:
     if not label:
         return Severity.LOW
-    normalized = label.strip().lower()
-    mapping = {
-        "critical": Severity.CRITICAL,
-        "high": Severity.HIGH,
-        "moderate": Severity.MEDIUM,
-        "medium": Severity.MEDIUM,
-        "low": Severity.LOW,
-    }
-    return mapping.get(normalized, Severity.LOW)
+    return _lookup_severity_label(label, Severity.LOW)
 
 
 def _severity_from_osv(entry: Mapping[str, object]) -> Severity:
@@ -125,25 +204,314 @@ def _severity_from_osv(entry: Mapping[str, object]) -> Severity:
     return _severity_from_label(label)
 
 
+_GITHUB_VULNERABILITY_SELECTION = """
+    nodes {
+      advisory {
+        ghsaId
+        summary
+        references { url }
+        severity
+      }
+      vulnerableVersionRange
+    }
+"""
+
+
+@lru_cache(maxsize=64)
+def _github_batch_query(size: int) -> str:
+    """Build one GraphQL document querying ``size`` packages via ``pkg<i>`` aliases."""
+
+    parameters = ", ".join(
+        f"$ecosystem{index}: SecurityAdvisoryEcosystem!, $package{index}: String!"
+        for index in range(size)
+    )
+    fields = "".join(
+        f"  pkg{index}: securityVulnerabilities("
+        f"first: 20, ecosystem: $ecosystem{index}, package: $package{index}) {{"
+        f"{_GITHUB_VULNERABILITY_SELECTION}  }}\n"
+        for index in range(size)
+    )
+    return f"query({parameters}) {{\n{fields}}}"
+
+
+_RANGE_CONSTRAINT = re.compile(r"^(<=|>=|<|>|=)\s*(\S+)$")
+
+
+@lru_cache(maxsize=4096)
+def _version_in_range(version: str, vulnerable_range: str | None) -> bool:
+    """Return whether ``version`` satisfies a GitHub ``vulnerableVersionRange``.
+
+    Ranges look like ``">= 1.0, < 1.4.2"``. Anything that cannot be parsed is
+    treated as affected so an advisory is never silently dropped.
+    """
+
+    if not vulnerable_range:
+        return True
+    try:
+        current = Version(version)
+    except InvalidVersion:
+        return True
+    for constraint in vulnerable_range.split(","):
+        match = _RANGE_CONSTRAINT.match(constraint.strip())
+        if match is None:
+            return True
+        operator, bound_raw = match.groups()
+        try:
+            bound = Version(bound_raw)
+        except InvalidVersion:
+            return True
+        satisfied = {
+            "=": current == bound,
+            "<": current < bound,
+            "<=": current <= bound,
+            ">": current > bound,
+            ">=": current >= bound,
+        }[operator]
+        if not satisfied:
+            return False
+    return True
+
+
+def _reference_urls(payload: object) -> list[str]:
+    """Return the distinct ``url`` values of a ``references`` payload in first-seen order."""
+
+    if not is_non_string_sequence(payload):
+        return []
+    return list(
+        dict.fromkeys(
+            url
+            for ref in payload
+            if isinstance(ref, Mapping) and isinstance(url := ref.get("url"), str)
+        )
+    )
+
+
+def _advisories_from_github_nodes(nodes_payload: object) -> _RangedAdvisories:
+    """Parse vulnerability nodes into advisories paired with their affected range."""
+
+    if not is_non_string_sequence(nodes_payload):
+        return []
+    advisories: _RangedAdvisories = []
+    for node in nodes_payload:
+        if not isinstance(node, Mapping):
+            continue
+        advisory_payload = node.get("advisory")
+        advisory_node = advisory_payload if isinstance(advisory_payload, Mapping) else {}
+        severity_label = node.get("severity") or advisory_node.get("severity")
+        severity = _severity_from_github(severity_label)
+        vulnerable_range = node.get("vulnerableVersionRange")
+        advisory = Advisory(
+            identifier=advisory_node.get("ghsaId", "GHSA-unknown"),
+            source="github",
+            severity=severity,
+            summary=advisory_node.get("summary", ""),
+            references=_reference_urls(advisory_node.get("references")),
+        )
+        advisories.append(
+            (advisory, vulnerable_range if isinstance(vulnerable_range, str) else None)
+        )
+    return advisories
+
+
+def _remember(
+    cache: OrderedDict[K, tuple[float, tuple[V, ...]]], size: int, key: K, values: Iterable[V]
+) -> None:
+    """Freeze ``values`` into an LRU ``cache`` bounded to ``size`` entries.
+
+    Entries are tuples so hits can be shared without defensive copies, and are
+    stamped with the monotonic time they were stored at for :func:`_recall`.
+    """
+
+    if size <= 0:
+        return
+    if key in cache:
+        cache.move_to_end(key)
+    else:
+        while len(cache) >= size:
+            cache.popitem(last=False)
+    cache[key] = (time.monotonic(), tuple(values))
+
+
+def _recall(
+    cache: OrderedDict[K, tuple[float, tuple[V, ...]]], key: K, ttl: int
+) -> tuple[V, ...] | None:
+    """Return the cached values for ``key``, dropping entries older than ``ttl`` seconds."""
+
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    stored_at, values = entry
+    if ttl > 0 and time.monotonic() - stored_at >= ttl:
+        del cache[key]
+        return None
+    cache.move_to_end(key)
+    return values
+
+
+# SQLite builds before 3.32 cap a statement at 999 bound parameters.
+_SQLITE_MAX_VARIABLES = 900
+
+
+class _OsvDiskCache:
+    """SQLite store of OSV results shared across runs, expiring after ``ttl`` seconds.
+
+    The cache is best-effort: any database error is logged once and disables it
+    for the rest of the run instead of failing the scan. Every method blocks on
+    disk I/O, so async callers run them via :func:`asyncio.to_thread`; a lock
+    serializes the shared connection across worker threads.
+    """
+
+    def __init__(self, path: Path, *, ttl: int) -> None:
+        self._path = path
+        self._ttl = ttl
+        self._connection: sqlite3.Connection | None = None
+        self._disabled = False
+        # Reentrant so a failing operation can close the connection via _disable.
+        self._lock = threading.RLock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self._path, check_same_thread=False)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS osv ("
+                "coordinate TEXT PRIMARY KEY, stored_at REAL NOT NULL, advisories TEXT NOT NULL)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def _disable(self, exc: Exception) -> None:
+        logger.warning("Disabling advisory disk cache at %s: %s", self._path, exc)
+        self._disabled = True
+        self.close()
+
+    def get_many(self, coordinates: Sequence[str]) -> dict[str, tuple[Advisory, ...]]:
+        if self._disabled or not coordinates:
+            return {}
+        oldest = time.time() - self._ttl if self._ttl > 0 else float("-inf")
+        hits: dict[str, tuple[Advisory, ...]] = {}
+        with self._lock:
+            if self._disabled:
+                return {}
+            try:
+                connection = self._connect()
+                for chunk in chunked(list(coordinates), _SQLITE_MAX_VARIABLES):
+                    # Only "?" placeholders are interpolated; every value is bound.
+                    placeholders = ", ".join("?" * len(chunk))
+                    query = (
+                        "SELECT coordinate, advisories FROM osv "  # noqa: S608
+                        f"WHERE stored_at > ? AND coordinate IN ({placeholders})"
+                    )
+                    rows = connection.execute(query, (oldest, *chunk))
+                    for coordinate, raw in rows:
+                        hits[coordinate] = tuple(
+                            Advisory(
+                                identifier=record["identifier"],
+                                source=record["source"],
+                                severity=Severity(record["severity"]),
+                                summary=record["summary"],
+                                references=list(record["references"]),
+                            )
+                            for record in safe_json_loads(raw)
+                        )
+            except (sqlite3.Error, OSError, ValueError, KeyError, TypeError) as exc:
+                self._disable(exc)
+                return {}
+        return hits
+
+    def put_many(self, entries: Mapping[str, Sequence[Advisory]]) -> None:
+        if self._disabled or not entries:
+            return
+        stored_at = time.time()
+        rows = [
+            (
+                coordinate,
+                stored_at,
+                json.dumps(
+                    [
+                        {
+                            "identifier": advisory.identifier,
+                            "source": advisory.source,
+                            "severity": advisory.severity.value,
+                            "summary": advisory.summary,
+                            "references": advisory.references,
+                        }
+                        for advisory in advisories
+                    ]
+                ),
+            )
+            for coordinate, advisories in entries.items()
+        ]
+        with self._lock:
+            if self._disabled:
+                return
+            try:
+                connection = self._connect()
+                with connection:
+                    connection.executemany("INSERT OR REPLACE INTO osv VALUES (?, ?, ?)", rows)
+            except (sqlite3.Error, OSError) as exc:
+                self._disable(exc)
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._disabled:
+                return
+            try:
+                connection = self._connect()
+                with connection:
+                    connection.execute("DELETE FROM osv")
+            except (sqlite3.Error, OSError) as exc:
+                self._disable(exc)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
 class AdvisoryClient:
     def __init__(
         self,
         *,
         timeout: float = config.HTTP_TIMEOUT,
         retries: int = config.HTTP_RETRIES,
+        attempt_timeout: float | None = config.HTTP_ATTEMPT_TIMEOUT,
+        client: httpx.AsyncClient | None = None,
     ) -> None:
-        self._client = httpx.AsyncClient(
-            timeout=timeout, headers={"User-Agent": config.USER_AGENT}
-        )
+        # A caller-provided client is shared with other components and closed by its owner.
+        self._owns_client = client is None
+        self._client = client if client is not None else build_http_client(timeout=timeout)
         self._retry = AsyncRetry(
-            retries=retries, delay=0.5, exceptions=(httpx.HTTPError,)
+            retries=retries,
+            delay=0.5,
+            exceptions=(httpx.HTTPError,),
+            attempt_timeout=attempt_timeout,
         )
         self._gh_token = os.getenv("RTX_GITHUB_TOKEN") or os.getenv(
             config.GITHUB_DEFAULT_TOKEN_ENV
         )
         self._gh_disabled = env_flag("RTX_DISABLE_GITHUB_ADVISORIES", False)
-        self._osv_cache: OrderedDict[str, list[Advisory]] = OrderedDict()
+        self._osv_cache: OrderedDict[str, tuple[float, tuple[Advisory, ...]]] = OrderedDict()
         self._osv_cache_size = config.OSV_CACHE_SIZE
+        # Per-host gates shared by every call on this client, so overlapping scans
+        # cannot multiply the number of requests in flight against one API.
+        self._osv_gate = asyncio.Semaphore(max(1, config.OSV_MAX_CONCURRENCY))
+        self._github_gate = asyncio.Semaphore(max(1, config.GITHUB_MAX_CONCURRENCY))
+        # Lookups currently on the wire, so overlapping callers share one request.
+        self._osv_inflight: dict[str, asyncio.Future[tuple[Advisory, ...]]] = {}
+        # Keyed per package: advisories carry their affected range and are
+        # filtered per dependency version, so every pinned version shares one query.
+        self._gh_cache: OrderedDict[
+            tuple[str, str], tuple[float, tuple[tuple[Advisory, str | None], ...]]
+        ] = OrderedDict()
+        self._gh_cache_size = config.GITHUB_CACHE_SIZE
+        self._cache_ttl = config.ADVISORY_CACHE_TTL
+        self._osv_disk_cache = (
+            _OsvDiskCache(config.CACHE_DIR / "advisories.sqlite3", ttl=self._cache_ttl)
+            if config.ADVISORY_DISK_CACHE
+            else None
+        )
 
     async def __aenter__(self) -> AdvisoryClient:
         return self
@@ -157,20 +525,38 @@ class AdvisoryClient:
         await self.close()
 
     async def close(self) -> None:
-        await self._client.aclose()
+        if self._osv_disk_cache is not None:
+            await asyncio.to_thread(self._osv_disk_cache.close)
+        if self._owns_client:
+            await self._client.aclose()
 
     async def fetch_advisories(
         self,
         dependencies: Iterable[Dependency],
     ) -> dict[str, list[Advisory]]:
-        deps = list(dependencies)
-        osv_results = await self._query_osv(deps)
-        gh_results: dict[str, list[Advisory]] = {}
-        if self._gh_token and not self._gh_disabled:
+        # Results are keyed by coordinate, so repeated pins are queried and merged once.
+        deps = unique_preserving_order(dependencies, key=attrgetter("coordinate"))
+        if not deps:
+            return {}
+
+        async def query_github() -> dict[str, list[Advisory]]:
+            if not self._gh_token or self._gh_disabled:
+                return {}
             try:
-                gh_results = await self._query_github(deps)
+                return await self._query_github(deps)
             except AdvisoryServiceError:
-                gh_results = {}
+                return {}
+
+        # The providers are independent, so overlap their round trips. Both are
+        # settled before a failure propagates so no request outlives the client.
+        osv_outcome, gh_outcome = await asyncio.gather(
+            self._query_osv(deps), query_github(), return_exceptions=True
+        )
+        if isinstance(osv_outcome, BaseException):
+            raise osv_outcome
+        if isinstance(gh_outcome, BaseException):
+            raise gh_outcome
+        osv_results, gh_results = osv_outcome, gh_outcome
         combined: dict[str, list[Advisory]] = {}
         for dep in deps:
             key = dep.coordinate
@@ -179,13 +565,9 @@ class AdvisoryClient:
                 dedup_key = (advisory.source, advisory.identifier)
                 existing = merged.get(dedup_key)
                 if existing is None:
-                    merged[dedup_key] = Advisory(
-                        identifier=advisory.identifier,
-                        source=advisory.source,
-                        severity=advisory.severity,
-                        summary=advisory.summary,
-                        references=unique_preserving_order(advisory.references),
-                    )
+                    # Cached advisories are shared across calls, so hand out a copy
+                    # with its own reference list; parsers already deduplicated it.
+                    merged[dedup_key] = replace(advisory, references=list(advisory.references))
                     continue
                 references = unique_preserving_order(
                     existing.references + advisory.references
@@ -226,28 +608,33 @@ class AdvisoryClient:
             logger.info("OSV lookups disabled via RTX_DISABLE_OSV")
             return {dep.coordinate: [] for dep in dependencies}
 
-        cached: dict[str, list[Advisory]] = {}
+        cached: dict[str, Sequence[Advisory]] = {}
+        borrowed: dict[str, tuple[Dependency, asyncio.Future[tuple[Advisory, ...]]]] = {}
         unique_uncached: dict[str, Dependency] = {}
-        supported_dependencies: list[Dependency] = []
         ecosystem_overrides: dict[str, str] = {}
         unsupported_coordinates: set[str] = set()
 
         for dep in dependencies:
             coordinate = dep.coordinate
-            osv_ecosystem = OSV_ECOSYSTEM_MAP.get(dep.ecosystem, dep.ecosystem)
-            if osv_ecosystem not in OSV_SUPPORTED_ECOSYSTEMS:
+            osv_ecosystem = _OSV_QUERY_ECOSYSTEMS.get(dep.ecosystem)
+            if osv_ecosystem is None:
                 unsupported_coordinates.add(coordinate)
                 continue
             ecosystem_overrides[coordinate] = osv_ecosystem
-            supported_dependencies.append(dep)
             if self._osv_cache_size > 0:
-                cached_value = self._osv_cache.get(coordinate)
+                cached_value = _recall(self._osv_cache, coordinate, self._cache_ttl)
                 if cached_value is not None:
-                    cached[coordinate] = list(cached_value)
-                    self._osv_cache.move_to_end(coordinate)
+                    cached[coordinate] = cached_value
                     continue
+            pending = self._osv_inflight.get(coordinate)
+            if pending is not None:
+                borrowed.setdefault(coordinate, (dep, pending))
+                continue
             unique_uncached.setdefault(coordinate, dep)
 
+        # Coordinates OSV refused to answer (4xx); reported empty but never cached.
+        unanswered: set[str] = set()
+
         async def task(chunk_deps: list[Dependency]) -> dict[str, list[Advisory]]:
             queries = [
                 {
@@ -259,9 +646,10 @@ class AdvisoryClient:
                 }
                 for dep in chunk_deps
             ]
-            response = await self._client.post(
-                config.OSV_API_URL, json={"queries": queries}
-            )
+            async with self._osv_gate:
+                response = await self._client.post(
+                    config.OSV_API_URL, json={"queries": queries}
+                )
             try:
                 response.raise_for_status()
             except httpx.HTTPStatusError as exc:
@@ -271,13 +659,12 @@ class AdvisoryClient:
                         "OSV returned HTTP %s; continuing without OSV advisories",
                         status,
                     )
+                    unanswered.update(dep.coordinate for dep in chunk_deps)
                     return {dep.coordinate: [] for dep in chunk_deps}
                 raise
-            payload = response.json()
             out: dict[str, list[Advisory]] = {}
-            results = list(payload.get("results") or [])
-            for index, dep in enumerate(chunk_deps):
-                entry = results[index] if index < len(results) else None
+            results = chain(_iter_osv_results(response), repeat(None))
+            for dep, entry in zip(chunk_deps, results):
                 vulns = (
                     (entry or {}).get("vulns", []) if isinstance(entry, dict) else []
                 )
@@ -286,68 +673,91 @@ class AdvisoryClient:
                     if not isinstance(vuln, Mapping):
                         continue
                     severity = _severity_from_osv(vuln)
-                    references_payload = vuln.get("references", [])
-                    references: list[str] = []
-                    if is_non_string_sequence(references_payload):
-                        for ref in references_payload:
-                            if isinstance(ref, Mapping):
-                                url = ref.get("url")
-                                if isinstance(url, str):
-                                    references.append(url)
                     advisory = Advisory(
                         identifier=str(vuln.get("id", "UNKNOWN")),
                         source="osv.dev",
                         severity=severity,
                         summary=str(vuln.get("summary", "")),
-                        references=references,
+                        references=_reference_urls(vuln.get("references")),
                     )
                     advisories.append(advisory)
                 out[dep.coordinate] = advisories
             return out
 
-        aggregated: dict[str, list[Advisory]] = dict(cached)
+        aggregated: dict[str, Sequence[Advisory]] = dict(cached)
         if unique_uncached:
-            uncached = list(unique_uncached.values())
-            chunks = [list(chunk) for chunk in chunked(uncached, config.OSV_BATCH_SIZE)]
-            max_concurrency = max(1, getattr(config, "OSV_MAX_CONCURRENCY", 1))
-            semaphore = asyncio.Semaphore(max_concurrency)
-
-            async def run_chunk(
-                chunk_deps: list[Dependency],
-            ) -> dict[str, list[Advisory]]:
-                async with semaphore:
-                    deps_copy = list(chunk_deps)
-
-                    async def execute() -> dict[str, list[Advisory]]:
-                        return await task(deps_copy)
-
-                    return await self._retry(execute)
-
-            chunk_results: list[dict[str, list[Advisory]]] = []
-
-            async def worker(chunk_deps: list[Dependency]) -> None:
-                chunk_results.append(await run_chunk(chunk_deps))
-
-            task_group_cls = getattr(asyncio, "TaskGroup", None)
-            if task_group_cls is not None:
-                tg = cast(Any, task_group_cls())
-                async with tg:
-                    for chunk in chunks:
-                        deps_copy = list(chunk)
-                        tg.create_task(worker(deps_copy))
-            else:  # pragma: no cover - Python <3.11 fallback
-                await asyncio.gather(*(worker(list(chunk)) for chunk in chunks))
+            loop = asyncio.get_running_loop()
+            # Registered before the first await (the disk cache included), so an
+            # overlapping caller borrows these lookups instead of starting its own.
+            owned = {coordinate: loop.create_future() for coordinate in unique_uncached}
+            self._osv_inflight.update(owned)
+            try:
+                if self._osv_disk_cache is not None:
+                    stored = await asyncio.to_thread(
+                        self._osv_disk_cache.get_many, list(unique_uncached)
+                    )
+                    for coordinate, stored_advisories in stored.items():
+                        del unique_uncached[coordinate]
+                        aggregated[coordinate] = stored_advisories
+                        _remember(
+                            self._osv_cache, self._osv_cache_size, coordinate, stored_advisories
+                        )
+                chunk_results: list[dict[str, list[Advisory]]] = []
+                if unique_uncached:
+                    uncached = list(unique_uncached.values())
+                    max_concurrency = max(1, getattr(config, "OSV_MAX_CONCURRENCY", 1))
+                    chunk_results = await self._retry.map(
+                        (
+                            partial(task, chunk)
+                            for chunk in chunked(uncached, config.OSV_BATCH_SIZE)
+                        ),
+                        concurrency=max_concurrency,
+                    )
+            except asyncio.CancelledError:
+                # Only this caller was cancelled; borrowers re-issue the lookup themselves.
+                for future in owned.values():
+                    future.set_exception(_AbandonedLookup())
+                    future.exception()
+                raise
+            except Exception as exc:
+                for future in owned.values():
+                    future.set_exception(exc)
+                    # Mark as retrieved; the error is raised to this caller below.
+                    future.exception()
+                raise
+            finally:
+                for coordinate, future in owned.items():
+                    if self._osv_inflight.get(coordinate) is future:
+                        del self._osv_inflight[coordinate]
 
+            fresh: dict[str, list[Advisory]] = {}
             for chunk_result in chunk_results:
                 for key, advisories in chunk_result.items():
                     aggregated[key] = advisories
-                    if self._osv_cache_size > 0:
-                        if key in self._osv_cache:
-                            self._osv_cache.move_to_end(key)
-                        else:
-                            while len(self._osv_cache) >= self._osv_cache_size:
-                                self._osv_cache.popitem(last=False)
-                        self._osv_cache[key] = list(advisories)
+                    if key in unanswered:
+                        continue
+                    fresh[key] = advisories
+                    _remember(self._osv_cache, self._osv_cache_size, key, advisories)
+            for coordinate, future in owned.items():
+                future.set_result(tuple(aggregated.get(coordinate, ())))
+            if fresh and self._osv_disk_cache is not None:
+                await asyncio.to_thread(self._osv_disk_cache.put_many, fresh)
+
+        # Resolve our own lookups first so callers waiting on each other never deadlock.
+        if borrowed:
+            shared = await asyncio.gather(
+                *(future for _, future in borrowed.values()), return_exceptions=True
+            )
+            abandoned: list[Dependency] = []
+            for (coordinate, (dep, _)), outcome in zip(borrowed.items(), shared):
+                if isinstance(outcome, _AbandonedLookup):
+                    abandoned.append(dep)
+                elif isinstance(outcome, BaseException):
+                    raise outcome
+                else:
+                    aggregated[coordinate] = outcome
+            if abandoned:
+                aggregated.update(await self._query_osv(abandoned))
 
         for coordinate in unsupported_coordinates:
             aggregated.setdefault(coordinate, [])
@@ -359,106 +769,92 @@ class AdvisoryClient:
 
     def clear_cache(self) -> None:
         self._osv_cache.clear()
+        self._gh_cache.clear()
+        if self._osv_disk_cache is not None:
+            self._osv_disk_cache.clear()
 
     async def _query_github(
         self, dependencies: list[Dependency]
     ) -> dict[str, list[Advisory]]:
-        query = """
-        query($ecosystem: SecurityAdvisoryEcosystem!, $package: String!) {
-          securityVulnerabilities(first: 20, ecosystem: $ecosystem, package: $package) {
-            nodes {
-              advisory {
-                ghsaId
-                summary
-                references { url }
-                severity
-              }
-              vulnerableVersionRange
-            }
-          }
-        }
-        """
-
-        async def fetch(dep: Dependency) -> list[Advisory]:
-            variables = {
-                "ecosystem": dep.ecosystem.upper(),
-                "package": dep.name,
-            }
-            response = await self._client.post(
-                config.GITHUB_ADVISORY_URL,
-                headers={"Authorization": f"Bearer {self._gh_token}"},
-                json={"query": query, "variables": variables},
-            )
+        if not dependencies:
+            return {}
+        # Built once per call and shared by every chunk; query documents are cached by size.
+        headers = {"Authorization": f"Bearer {self._gh_token}"}
+
+        async def fetch(chunk: list[Dependency]) -> dict[tuple[str, str], _RangedAdvisories]:
+            variables: dict[str, str] = {}
+            for index, dep in enumerate(chunk):
+                variables[f"ecosystem{index}"] = GITHUB_ECOSYSTEM_MAP[dep.normalized_ecosystem]
+                variables[f"package{index}"] = dep.name
+            async with self._github_gate:
+                response = await self._client.post(
+                    config.GITHUB_ADVISORY_URL,
+                    headers=headers,
+                    json={"query": _github_batch_query(len(chunk)), "variables": variables},
+                )
             if response.status_code == 401:
                 raise AdvisoryServiceError("Invalid GitHub token")
             response.raise_for_status()
-            data = response.json()
-            advisories: list[Advisory] = []
-            nodes_payload = (
-                data.get("data", {}).get("securityVulnerabilities", {}).get("nodes", [])
-            )
-            if is_non_string_sequence(nodes_payload):
-                nodes = [node for node in nodes_payload if isinstance(node, Mapping)]
-            else:
-                nodes = []
-            for node in nodes:
-                advisory_payload = node.get("advisory")
-                advisory_node = (
-                    advisory_payload if isinstance(advisory_payload, Mapping) else {}
-                )
-                severity_label = node.get("severity") or advisory_node.get("severity")
-                severity = _severity_from_github(severity_label)
-                references_payload = advisory_node.get("references", [])
-                reference_urls: list[str] = []
-                if is_non_string_sequence(references_payload):
-                    for ref in references_payload:
-                        if isinstance(ref, Mapping):
-                            url = ref.get("url")
-                            if isinstance(url, str):
-                                reference_urls.append(url)
-                references = unique_preserving_order(reference_urls)
-                advisories.append(
-                    Advisory(
-                        identifier=advisory_node.get("ghsaId", "GHSA-unknown"),
-                        source="github",
-                        severity=severity,
-                        summary=advisory_node.get("summary", ""),
-                        references=references,
-                    )
-                )
-            return advisories
+            payload = safe_json_loads(response.content)
+            data = payload.get("data") if isinstance(payload, Mapping) else None
+            if not isinstance(data, Mapping):
+                # GraphQL reports failures such as rate limiting with HTTP 200 and
+                # ``"data": null``; raise so the empty batch is never cached as clean.
+                errors = payload.get("errors") if isinstance(payload, Mapping) else None
+                raise AdvisoryServiceError(f"GitHub advisory query failed: {errors or payload!r}")
+            out: dict[tuple[str, str], _RangedAdvisories] = {}
+            for index, dep in enumerate(chunk):
+                payload = data.get(f"pkg{index}")
+                nodes = payload.get("nodes") if isinstance(payload, Mapping) else None
+                # A missing or null alias failed on GitHub's side; leave it out so it
+                # is neither cached nor reported as clean.
+                if not isinstance(nodes, list):
+                    continue
+                out[(dep.ecosystem, dep.name)] = _advisories_from_github_nodes(nodes)
+            return out
 
         results: dict[str, list[Advisory]] = {}
-        semaphore = asyncio.Semaphore(config.GITHUB_MAX_CONCURRENCY)
-
-        async def run(dep: Dependency) -> tuple[Dependency, list[Advisory] | Exception]:
-            async with semaphore:
-                try:
-
-                    async def execute() -> list[Advisory]:
-                        return await fetch(dep)
 
-                    advisories = await self._retry(execute)
-                except Exception as exc:
-                    return dep, exc
-                return dep, advisories
+        async def run(
+            chunk: list[Dependency],
+        ) -> dict[tuple[str, str], _RangedAdvisories] | Exception:
+            try:
+                return await self._retry(partial(fetch, chunk))
+            except Exception as exc:
+                return exc
 
+        per_package: dict[tuple[str, str], Sequence[tuple[Advisory, str | None]]] = {}
         unique: dict[tuple[str, str], Dependency] = {}
         for dep in dependencies:
             package_key = (dep.ecosystem, dep.name)
-            unique.setdefault(package_key, dep)
+            if dep.normalized_ecosystem not in GITHUB_ECOSYSTEM_MAP:
+                continue
+            if package_key in per_package or package_key in unique:
+                continue
+            cached_value = (
+                _recall(self._gh_cache, package_key, self._cache_ttl)
+                if self._gh_cache_size > 0
+                else None
+            )
+            if cached_value is not None:
+                per_package[package_key] = cached_value
+                continue
+            unique[package_key] = dep
 
-        tasks = [run(dep) for dep in unique.values()]
-        completed = await asyncio.gather(*tasks)
-        per_package: dict[tuple[str, str], list[Advisory]] = {}
-        for dep, outcome in completed:
+        tasks = [run(chunk) for chunk in chunked(list(unique.values()), config.GITHUB_BATCH_SIZE)]
+        for outcome in await asyncio.gather(*tasks):
             if isinstance(outcome, Exception):
                 continue
-            per_package[(dep.ecosystem, dep.name)] = outcome
+            for package_key, ranged in outcome.items():
+                per_package[package_key] = ranged
+                _remember(self._gh_cache, self._gh_cache_size, package_key, ranged)
 
         for dep in dependencies:
             coordinate_key = dep.coordinate
             package_key = (dep.ecosystem, dep.name)
-            advisories = per_package.get(package_key, [])
-            results[coordinate_key] = list(advisories)
+            results[coordinate_key] = [
+                advisory
+                for advisory, vulnerable_range in per_package.get(package_key, [])
+                if _version_in_range(dep.version, vulnerable_range)
+            ]
         return results
@@ -2,48 +2,74 @@ from __future__ import annotations
 
 import asyncio
 from collections import Counter
-from collections.abc import Awaitable
+from collections.abc import Awaitable, Sequence
 from pathlib import Path
-from typing import Any, cast
+from typing import Any
 
 from rtx import config
 from rtx.advisory import AdvisoryClient
 from rtx.exceptions import ManifestNotFound
-from rtx.models import Dependency, PackageFinding, Report
+from rtx.models import Dependency, Report
 from rtx.policy import TrustPolicyEngine
 from rtx.registry import get_scanners
-from rtx.utils import Graph, is_non_string_sequence, unique_preserving_order, utc_now
-
-
-def _merge_dependency(existing: Dependency, new: Dependency) -> Dependency:
-    combined_metadata = {**existing.metadata, **new.metadata}
-    manifests: list[str] = [str(existing.manifest), str(new.manifest)]
-    previous = combined_metadata.get("manifests")
-    if is_non_string_sequence(previous):
-        manifests.extend(str(value) for value in previous)
-    elif isinstance(previous, str):
-        manifests.append(previous)
+from rtx.scanners.base import BaseScanner
+from rtx.utils import (
+    Graph,
+    build_http_client,
+    is_non_string_sequence,
+    run_async,
+    unique_preserving_order,
+    utc_now,
+)
+
+
+def _merge_dependencies(group: Sequence[Dependency]) -> Dependency:
+    """Fold every occurrence of one coordinate into a single dependency in one pass."""
+
+    first = group[0]
+    combined_metadata: dict[str, Any] = {}
+    manifests: list[str] = [str(dep.manifest) for dep in group]
+    for dep in group:
+        combined_metadata.update(dep.metadata)
+        previous = dep.metadata.get("manifests")
+        if is_non_string_sequence(previous):
+            manifests.extend(str(value) for value in previous)
+        elif isinstance(previous, str):
+            manifests.append(previous)
     combined_metadata["manifests"] = unique_preserving_order(manifests)
     return Dependency(
-        ecosystem=existing.ecosystem,
-        name=existing.name,
-        version=existing.version,
-        direct=existing.direct or new.direct,
-        manifest=existing.manifest,
+        ecosystem=first.ecosystem,
+        name=first.name,
+        version=first.version,
+        direct=any(dep.direct for dep in group),
+        manifest=first.manifest,
         metadata=combined_metadata,
     )
 
 
+def _merge_dependency(existing: Dependency, new: Dependency) -> Dependency:
+    return _merge_dependencies((existing, new))
+
+
+def _detect_and_scan(scanner: BaseScanner, root: Path, *, detect: bool) -> list[Dependency]:
+    """Run manifest detection and the scan together on a worker thread."""
+
+    if detect and not scanner.matches(root):
+        return []
+    return scanner.scan(root)
+
+
 async def scan_project_async(path: Path, *, managers: list[str] | None = None) -> Report:
     root = path.resolve()
     scanners = get_scanners(managers)
     discovered: list[Dependency] = []
     used_managers: list[str] = []
-    scan_jobs: list[tuple[str, Awaitable[list[Dependency]]]] = []
-    for scanner in scanners:
-        if managers is None and not scanner.matches(root):
-            continue
-        scan_jobs.append((scanner.manager, asyncio.to_thread(scanner.scan, root)))
+    # Detection can walk the tree, so it runs alongside the scan rather than on the loop.
+    detect = managers is None
+    scan_jobs: list[tuple[str, Awaitable[list[Dependency]]]] = [
+        (scanner.manager, asyncio.to_thread(_detect_and_scan, scanner, root, detect=detect))
+        for scanner in scanners
+    ]
 
     if scan_jobs:
         results = await asyncio.gather(*(job for _, job in scan_jobs))
@@ -54,42 +80,28 @@ async def scan_project_async(path: Path, *, managers: list[str] | None = None) -
     if not discovered:
         raise ManifestNotFound("No supported manifests found")
 
-    unique_deps: dict[str, Dependency] = {}
+    # Group first so a package seen in many manifests is merged once, not pairwise.
+    by_coordinate: dict[str, list[Dependency]] = {}
     for dep in discovered:
-        existing = unique_deps.get(dep.coordinate)
-        if existing is None:
-            unique_deps[dep.coordinate] = dep
-        else:
-            unique_deps[dep.coordinate] = _merge_dependency(existing, dep)
-    dependencies = list(unique_deps.values())
-
-    async with AdvisoryClient() as advisory_client:
-        advisory_map = await advisory_client.fetch_advisories(dependencies)
+        by_coordinate.setdefault(dep.coordinate, []).append(dep)
+    dependencies = [
+        group[0] if len(group) == 1 else _merge_dependencies(group)
+        for group in by_coordinate.values()
+    ]
 
     limit = max(1, getattr(config, "POLICY_ANALYSIS_CONCURRENCY", 1))
-    semaphore = asyncio.Semaphore(limit)
-    findings_buffer: list[PackageFinding | None] = [None] * len(dependencies)
-
-    async with TrustPolicyEngine() as engine:
-
-        async def analyze_with_limit(index: int, dep: Dependency) -> None:
-            async with semaphore:
-                findings_buffer[index] = await engine.analyze(
-                    dep, advisory_map.get(dep.coordinate, [])
-                )
-
-        task_group_cls = getattr(asyncio, "TaskGroup", None)
-        if task_group_cls is not None:
-            tg = cast(Any, task_group_cls())
-            async with tg:
-                for index, dep in enumerate(dependencies):
-                    tg.create_task(analyze_with_limit(index, dep))
-        else:
-            await asyncio.gather(
-                *(analyze_with_limit(index, dep) for index, dep in enumerate(dependencies))
-            )
-
-    findings: list[PackageFinding] = [finding for finding in findings_buffer if finding is not None]
+
+    # One connection pool serves both the advisory and registry-metadata lookups.
+    async with (
+        build_http_client(timeout=config.HTTP_TIMEOUT) as http_client,
+        AdvisoryClient(client=http_client) as advisory_client,
+        TrustPolicyEngine(http_client=http_client) as engine,
+    ):
+        advisory_map = await advisory_client.fetch_advisories(dependencies)
+        findings = await engine.analyze_many(
+            ((dep, advisory_map.get(dep.coordinate, [])) for dep in dependencies),
+            concurrency=limit,
+        )
 
     graph = Graph()
     for finding in findings:
@@ -131,4 +143,4 @@ async def scan_project_async(path: Path, *, managers: list[str] | None = None) -
 
 
 def scan_project(path: Path, managers: list[str] | None = None) -> Report:
-    return asyncio.run(scan_project_async(path, managers=managers))
+    return run_async(scan_project_async(path, managers=managers), use_uvloop=config.UVLOOP)
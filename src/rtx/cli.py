@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import argparse
-import asyncio
 import json
 import logging
 import sys
@@ -13,10 +12,11 @@ from typing import cast
 
 from rich.console import Console
 
+from rtx import config
 from rtx.exceptions import ManifestNotFound, ReportRenderingError
 from rtx.models import Report, Severity
 from rtx.system import collect_manager_diagnostics
-from rtx.utils import is_non_string_sequence, utc_now
+from rtx.utils import build_http_client, is_non_string_sequence, run_async, utc_now
 
 
 def _configure_logging(level: str) -> None:
@@ -130,12 +130,15 @@ def cmd_pre_upgrade(args: argparse.Namespace) -> int:
     )
 
     async def evaluate() -> PackageFinding:
-        async with AdvisoryClient() as advisory_client:
+        async with (
+            build_http_client(timeout=config.HTTP_TIMEOUT) as http_client,
+            AdvisoryClient(client=http_client) as advisory_client,
+            TrustPolicyEngine(http_client=http_client) as engine,
+        ):
             advisory_map = await advisory_client.fetch_advisories([dependency])
-        async with TrustPolicyEngine() as engine:
             return await engine.analyze(dependency, advisory_map.get(dependency.coordinate, []))
 
-    finding = asyncio.run(evaluate())
+    finding = run_async(evaluate(), use_uvloop=config.UVLOOP)
     console.print(f"Baseline: {baseline.dependency.version} → {baseline.verdict.value}")
     console.print(f"Proposed: {args.version} → {finding.verdict.value}")
 
@@ -428,8 +431,14 @@ def build_parser() -> argparse.ArgumentParser:
     return parser
 
 
+@lru_cache(maxsize=1)
+def _get_parser() -> argparse.ArgumentParser:
+    # parse_args never mutates the parser, so one instance serves every main() call.
+    return build_parser()
+
+
 def main(argv: list[str] | None = None) -> int:
-    parser = build_parser()
+    parser = _get_parser()
     args = parser.parse_args(argv)
     command = cast(Callable[[argparse.Namespace], int], args.func)
     return command(args)
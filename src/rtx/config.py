@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 import os
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib.util import find_spec
 from pathlib import Path
 
 from rtx import __version__
@@ -60,22 +63,105 @@ def _cpu_parallel_default() -> int:
     return max(1, min(32, count))
 
 
-DEFAULT_POLICY_CONCURRENCY = _cpu_parallel_default()
-
-
-POLICY_ANALYSIS_CONCURRENCY = _int_env("RTX_POLICY_CONCURRENCY", DEFAULT_POLICY_CONCURRENCY)
-HTTP_TIMEOUT = _float_env("RTX_HTTP_TIMEOUT", 5.0)
-HTTP_RETRIES = _non_negative_int_env("RTX_HTTP_RETRIES", 2)
-OSV_BATCH_SIZE = _int_env("RTX_OSV_BATCH_SIZE", 18)
-OSV_MAX_CONCURRENCY = _int_env("RTX_OSV_MAX_CONCURRENCY", 4)
-OSV_CACHE_SIZE = _non_negative_int_env("RTX_OSV_CACHE_SIZE", 512)
-DISABLE_OSV = _bool_env("RTX_DISABLE_OSV", False)
-GITHUB_MAX_CONCURRENCY = _int_env("RTX_GITHUB_MAX_CONCURRENCY", 6)
-GOMOD_METADATA_CONCURRENCY = _int_env("RTX_GOMOD_CONCURRENCY", 5)
+# api.osv.dev/v1/querybatch accepts at most 1000 queries per request.
+OSV_MAX_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Environment-driven tunables, read once per :func:`settings` cache."""
+
+    default_policy_concurrency: int
+    policy_analysis_concurrency: int
+    http_timeout: float
+    http_retries: int
+    http_attempt_timeout: float
+    http_max_connections: int
+    http_max_keepalive_connections: int
+    http_keepalive_expiry: float
+    http2: bool
+    osv_batch_size: int
+    osv_max_concurrency: int
+    osv_cache_size: int
+    disable_osv: bool
+    json_streaming: bool
+    json_streaming_threshold: int
+    uvloop: bool
+    github_max_concurrency: int
+    github_cache_size: int
+    github_batch_size: int
+    advisory_cache_ttl: int
+    advisory_disk_cache: bool
+    gomod_metadata_concurrency: int
+    github_default_token_env: str
+
+
+@lru_cache(maxsize=1)
+def settings() -> Settings:
+    """Parse the ``RTX_*`` environment; call ``settings.cache_clear()`` to re-read it."""
+    default_policy_concurrency = _cpu_parallel_default()
+    return Settings(
+        default_policy_concurrency=default_policy_concurrency,
+        policy_analysis_concurrency=_int_env("RTX_POLICY_CONCURRENCY", default_policy_concurrency),
+        http_timeout=_float_env("RTX_HTTP_TIMEOUT", 5.0),
+        http_retries=_non_negative_int_env("RTX_HTTP_RETRIES", 2),
+        # Wall-clock ceiling for one request attempt, so a stalled response is retried.
+        http_attempt_timeout=_float_env("RTX_HTTP_ATTEMPT_TIMEOUT", 30.0),
+        http_max_connections=_int_env("RTX_HTTP_MAX_CONNECTIONS", 100),
+        http_max_keepalive_connections=_int_env("RTX_HTTP_MAX_KEEPALIVE_CONNECTIONS", 20),
+        http_keepalive_expiry=_float_env("RTX_HTTP_KEEPALIVE_EXPIRY", 30.0),
+        # HTTP/2 needs the optional ``h2`` package (``httpx[http2]``).
+        http2=_bool_env("RTX_HTTP2", True) and find_spec("h2") is not None,
+        osv_batch_size=min(_int_env("RTX_OSV_BATCH_SIZE", OSV_MAX_BATCH_SIZE), OSV_MAX_BATCH_SIZE),
+        osv_max_concurrency=_int_env("RTX_OSV_MAX_CONCURRENCY", 4),
+        osv_cache_size=_non_negative_int_env("RTX_OSV_CACHE_SIZE", 512),
+        disable_osv=_bool_env("RTX_DISABLE_OSV", False),
+        json_streaming=_bool_env("RTX_JSON_STREAMING", False),
+        # OSV responses at least this many bytes are stream-parsed when ijson is available
+        # (0 disables).
+        json_streaming_threshold=_non_negative_int_env("RTX_JSON_STREAMING_THRESHOLD", 64 * 1024),
+        uvloop=_bool_env("RTX_UVLOOP", True),
+        github_max_concurrency=_int_env("RTX_GITHUB_MAX_CONCURRENCY", 6),
+        github_cache_size=_non_negative_int_env("RTX_GITHUB_CACHE_SIZE", 512),
+        github_batch_size=_int_env("RTX_GITHUB_BATCH_SIZE", 50),
+        # Seconds an in-memory OSV/GitHub cache entry stays fresh (0 keeps entries until
+        # evicted).
+        advisory_cache_ttl=_non_negative_int_env("RTX_ADVISORY_CACHE_TTL", 3600),
+        # Opt-in SQLite copy of OSV results under CACHE_DIR, reused across runs within the TTL.
+        advisory_disk_cache=_bool_env("RTX_ADVISORY_DISK_CACHE", False),
+        gomod_metadata_concurrency=_int_env("RTX_GOMOD_CONCURRENCY", 5),
+        github_default_token_env=os.getenv("RTX_GITHUB_DEFAULT_TOKEN_ENV", "GITHUB_TOKEN"),
+    )
+
+
+# Module-level constants are the import-time snapshot the rest of the package reads.
+_SETTINGS = settings()
+DEFAULT_POLICY_CONCURRENCY = _SETTINGS.default_policy_concurrency
+POLICY_ANALYSIS_CONCURRENCY = _SETTINGS.policy_analysis_concurrency
+HTTP_TIMEOUT = _SETTINGS.http_timeout
+HTTP_RETRIES = _SETTINGS.http_retries
+HTTP_ATTEMPT_TIMEOUT = _SETTINGS.http_attempt_timeout
+HTTP_MAX_CONNECTIONS = _SETTINGS.http_max_connections
+HTTP_MAX_KEEPALIVE_CONNECTIONS = _SETTINGS.http_max_keepalive_connections
+HTTP_KEEPALIVE_EXPIRY = _SETTINGS.http_keepalive_expiry
+HTTP2 = _SETTINGS.http2
+OSV_BATCH_SIZE = _SETTINGS.osv_batch_size
+OSV_MAX_CONCURRENCY = _SETTINGS.osv_max_concurrency
+OSV_CACHE_SIZE = _SETTINGS.osv_cache_size
+DISABLE_OSV = _SETTINGS.disable_osv
+JSON_STREAMING = _SETTINGS.json_streaming
+JSON_STREAMING_THRESHOLD = _SETTINGS.json_streaming_threshold
+UVLOOP = _SETTINGS.uvloop
+GITHUB_MAX_CONCURRENCY = _SETTINGS.github_max_concurrency
+GITHUB_CACHE_SIZE = _SETTINGS.github_cache_size
+GITHUB_BATCH_SIZE = _SETTINGS.github_batch_size
+ADVISORY_CACHE_TTL = _SETTINGS.advisory_cache_ttl
+ADVISORY_DISK_CACHE = _SETTINGS.advisory_disk_cache
+GOMOD_METADATA_CONCURRENCY = _SETTINGS.gomod_metadata_concurrency
 
 OSV_API_URL = "https://api.osv.dev/v1/querybatch"
 GITHUB_ADVISORY_URL = "https://api.github.com/graphql"
-GITHUB_DEFAULT_TOKEN_ENV = os.getenv("RTX_GITHUB_DEFAULT_TOKEN_ENV", "GITHUB_TOKEN")
+GITHUB_DEFAULT_TOKEN_ENV = _SETTINGS.github_default_token_env
 
 SUPPORTED_MANAGERS: dict[str, dict[str, list[str]]] = {
     "npm": {
@@ -11,7 +11,7 @@ import httpx
 
 from rtx import config
 from rtx.models import Dependency
-from rtx.utils import AsyncRetry, utc_now
+from rtx.utils import AsyncRetry, build_http_client, safe_json_loads, utc_now
 
 ISO_FORMATS = [
     "%Y-%m-%dT%H:%M:%S.%f%z",
@@ -37,36 +37,35 @@ def _parse_date(value: str | None) -> datetime | None:
         return None
     if trimmed.endswith("Z"):
         trimmed = f"{trimmed[:-1]}+00:00"
+    # fromisoformat is implemented in C and covers nearly every registry timestamp;
+    # strptime only handles what it rejects (e.g. 1-5 digit fractions before 3.11).
+    try:
+        return _normalize_datetime(datetime.fromisoformat(trimmed))
+    except ValueError:
+        pass
     for fmt in ISO_FORMATS:
         try:
             return _normalize_datetime(datetime.strptime(trimmed, fmt))
         except ValueError:
             continue
-    try:
-        return _normalize_datetime(datetime.fromisoformat(trimmed))
-    except ValueError:
-        return None
+    return None
 
 
 def _dedupe_names(candidates: Iterable[str | None]) -> list[str]:
     """Return a case-insensitive, order-preserving list of maintainer names."""
-    seen: set[str] = set()
-    result: list[str] = []
+    # Keyed by casefolded name; setdefault keeps the first spelling seen.
+    unique: dict[str, str] = {}
     for candidate in candidates:
         if candidate is None:
             continue
         cleaned = candidate.strip()
-        if not cleaned:
-            continue
-        marker = cleaned.casefold()
-        if marker in seen:
-            continue
-        seen.add(marker)
-        result.append(cleaned)
-    return result
+        if cleaned:
+            unique.setdefault(cleaned.casefold(), cleaned)
+    return list(unique.values())
 
 
-@dataclass(slots=True)
+# Frozen because MetadataClient hands the same cached instance to every caller.
+@dataclass(frozen=True, slots=True)
 class ReleaseMetadata:
     latest_release: datetime | None
     releases_last_30d: int
@@ -121,12 +120,17 @@ class MetadataClient:
         *,
         timeout: float = config.HTTP_TIMEOUT,
         retries: int = config.HTTP_RETRIES,
+        attempt_timeout: float | None = config.HTTP_ATTEMPT_TIMEOUT,
+        client: httpx.AsyncClient | None = None,
     ) -> None:
-        self._client = httpx.AsyncClient(
-            timeout=timeout, headers={"User-Agent": config.USER_AGENT}
-        )
+        # A caller-provided client is shared with other components and closed by its owner.
+        self._owns_client = client is None
+        self._client = client if client is not None else build_http_client(timeout=timeout)
         self._retry = AsyncRetry(
-            retries=retries, delay=0.5, exceptions=(httpx.HTTPError,)
+            retries=retries,
+            delay=0.5,
+            exceptions=(httpx.HTTPError,),
+            attempt_timeout=attempt_timeout,
         )
         self._cache: dict[str, ReleaseMetadata] = {}
         self._inflight: dict[str, asyncio.Task[ReleaseMetadata]] = {}
@@ -156,7 +160,8 @@ class MetadataClient:
         await self.close()
 
     async def close(self) -> None:
-        await self._client.aclose()
+        if self._owns_client:
+            await self._client.aclose()
 
     async def clear_cache(self, *, cancel_inflight: bool = False) -> None:
         async with self._lock:
@@ -212,7 +217,7 @@ class MetadataClient:
         if response.status_code == 404:
             return ReleaseMetadata(None, 0, 0, [], dependency.ecosystem)
         response.raise_for_status()
-        data = response.json()
+        data = safe_json_loads(response.content)
         releases = data.get("releases", {})
         last_release = None
         releases_last_30d = 0
@@ -285,7 +290,7 @@ class MetadataClient:
         if response.status_code == 404:
             return ReleaseMetadata(None, 0, 0, [], dependency.ecosystem)
         response.raise_for_status()
-        data = response.json()
+        data = safe_json_loads(response.content)
         time_entries = data.get("time", {})
         maintainer_candidates: list[str] = []
         for maintainer in data.get("maintainers", []) or []:
@@ -335,7 +340,7 @@ class MetadataClient:
         if response.status_code == 404:
             return ReleaseMetadata(None, 0, 0, [], dependency.ecosystem)
         response.raise_for_status()
-        data = response.json()
+        data = safe_json_loads(response.content)
         crate = data.get("crate", {})
         versions = data.get("versions", []) or []
         last_release = _parse_date(crate.get("updated_at"))
@@ -389,7 +394,7 @@ class MetadataClient:
             if info_resp.status_code != 200:
                 return None
             try:
-                info = info_resp.json()
+                info = safe_json_loads(info_resp.content)
             except ValueError:
                 return None
             timestamp = info.get("Time") if isinstance(info, dict) else None
@@ -422,7 +427,7 @@ class MetadataClient:
         if response.status_code == 404:
             return ReleaseMetadata(None, 0, 0, [], dependency.ecosystem)
         response.raise_for_status()
-        entries = response.json()
+        entries = safe_json_loads(response.content)
         if not isinstance(entries, list):
             entries = []
         now = utc_now()
@@ -445,7 +450,7 @@ class MetadataClient:
         gem_url = f"https://rubygems.org/api/v1/gems/{name}.json"
         detail_response = await self._client.get(gem_url)
         if detail_response.status_code == 200:
-            details = detail_response.json()
+            details = safe_json_loads(detail_response.content)
             authors = details.get("authors")
             if isinstance(authors, str):
                 maintainers = _dedupe_names(author for author in authors.split(","))
@@ -478,7 +483,7 @@ class MetadataClient:
         if response.status_code == 404:
             return ReleaseMetadata(None, 0, 0, [], dependency.ecosystem)
         response.raise_for_status()
-        payload = response.json()
+        payload = safe_json_loads(response.content)
         docs = payload.get("response", {}).get("docs", [])
         if not isinstance(docs, list):
             docs = []
@@ -522,7 +527,7 @@ class MetadataClient:
         if response.status_code == 404:
             return ReleaseMetadata(None, 0, 0, [], dependency.ecosystem)
         response.raise_for_status()
-        data = response.json()
+        data = safe_json_loads(response.content)
         items = data.get("items", []) if isinstance(data, dict) else []
         now = utc_now()
         latest = None
@@ -570,7 +575,7 @@ class MetadataClient:
         if response.status_code == 404:
             return ReleaseMetadata(None, 0, 0, [], dependency.ecosystem)
         response.raise_for_status()
-        payload = response.json()
+        payload = safe_json_loads(response.content)
         packages = payload.get("package", {}).get("versions", {})
         if not isinstance(packages, dict):
             packages = {}
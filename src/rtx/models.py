@@ -45,11 +45,14 @@ class Dependency:
     version: str
     direct: bool
     manifest: Path
-    metadata: dict[str, Any] = field(default_factory=dict)
-
-    @property
-    def coordinate(self) -> str:
-        return f"{self.ecosystem}:{self.name}@{self.version}"
+    # Still compared for equality, but left out of the hash so dependencies can
+    # be deduplicated in sets and dict keys despite carrying a mutable dict.
+    metadata: dict[str, Any] = field(default_factory=dict, hash=False)
+    # Derived from the identity fields once; it keys every advisory and finding lookup.
+    coordinate: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "coordinate", f"{self.ecosystem}:{self.name}@{self.version}")
 
     @property
     def normalized_name(self) -> str:
@@ -2,12 +2,15 @@ from __future__ import annotations
 
 from collections.abc import Iterable, Mapping, Sequence
 from dataclasses import dataclass
+from functools import partial
 from types import TracebackType
 
+import httpx
+
 from rtx import config
 from rtx.metadata import MetadataClient, ReleaseMetadata
 from rtx.models import Advisory, Dependency, PackageFinding, Severity, TrustSignal
-from rtx.utils import load_json_resource, unique_preserving_order
+from rtx.utils import gather_bounded, load_json_resource, unique_preserving_order
 
 SEVERITY_SCORE = {
     Severity.NONE: 0.0,
@@ -57,7 +60,7 @@ class ThreatSignals:
 
 
 class TrustPolicyEngine:
-    def __init__(self) -> None:
+    def __init__(self, *, http_client: httpx.AsyncClient | None = None) -> None:
         top_packages_path = config.DATA_DIR / "top_packages.json"
         compromised_path = config.DATA_DIR / "compromised_maintainers.json"
         raw_top_packages = load_json_resource(top_packages_path)
@@ -95,7 +98,7 @@ class TrustPolicyEngine:
                     continue
                 key = (ecosystem.casefold(), package.casefold())
                 self._compromised_index[key] = dict(entry)
-        self._metadata_client = MetadataClient()
+        self._metadata_client = MetadataClient(client=http_client)
 
     async def __aenter__(self) -> TrustPolicyEngine:
         return self
@@ -126,6 +129,22 @@ class TrustPolicyEngine:
         )
         return finding
 
+    async def analyze_many(
+        self,
+        items: Iterable[tuple[Dependency, list[Advisory]]],
+        *,
+        concurrency: int = 1,
+    ) -> list[PackageFinding]:
+        """Analyze ``(dependency, advisories)`` pairs with at most ``concurrency`` in flight.
+
+        Findings are returned in input order.
+        """
+
+        return await gather_bounded(
+            (partial(self.analyze, dependency, advisories) for dependency, advisories in items),
+            concurrency=max(1, concurrency),
+        )
+
     def _derive_signals(
         self,
         dependency: Dependency,
@@ -22,18 +22,19 @@ __all__ = [
     "read_yaml",
     "read_json",
     "merge_dependency_version",
+    "strip_inline_comment",
 ]
 
 _INLINE_COMMENT_PATTERN = re.compile(r"\s+#.*$")
 
 
-def _strip_inline_comment(line: str) -> str:
+def strip_inline_comment(line: str) -> str:
     """Remove trailing inline comments that are prefixed by whitespace."""
     return _INLINE_COMMENT_PATTERN.sub("", line).strip()
 
 
 def _parse_requirement_line(line: str) -> tuple[str, str] | None:
-    cleaned = _strip_inline_comment(line)
+    cleaned = strip_inline_comment(line)
     if not cleaned or cleaned.startswith("#"):
         return None
     if cleaned.startswith("-"):
@@ -487,7 +488,7 @@ def read_requirements(
             direct_lines.append(raw_line)
             continue
 
-        cleaned = _strip_inline_comment(raw_line)
+        cleaned = strip_inline_comment(raw_line)
         try:
             tokens = shlex.split(cleaned) if cleaned else []
         except ValueError:
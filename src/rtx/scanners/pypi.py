@@ -372,25 +372,28 @@ def _record_requirements(
     optional: bool = False,
     extras: tuple[str, ...] | None = None,
 ) -> None:
-    for dependency in entries:
-        if not isinstance(dependency, str):
-            continue
+    candidates = [
+        cleaned
+        for cleaned in (
+            common.strip_inline_comment(entry) for entry in entries if isinstance(entry, str)
+        )
+        if cleaned and not cleaned.startswith("#")
+    ]
+    for dependency in candidates:
         try:
             requirement = Requirement(dependency)
         except InvalidRequirement:
-            name = dependency.strip()
-            if name:
-                record(
-                    name,
-                    "*",
-                    source,
-                    direct=direct,
-                    scope=scope,
-                    optional=optional,
-                    extras=extras,
-                    marker=None,
-                    requires_extras=None,
-                )
+            record(
+                dependency,
+                "*",
+                source,
+                direct=direct,
+                scope=scope,
+                optional=optional,
+                extras=extras,
+                marker=None,
+                requires_extras=None,
+            )
             continue
         if requirement.url:
             version = f"@ {requirement.url}"
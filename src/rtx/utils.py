@@ -1,145 +1,402 @@
 from __future__ import annotations
 
 import asyncio
+import fnmatch
 import json
+import mmap
 import os
+import random
 import re
+import ssl
 import sys
-import textwrap
-from collections import defaultdict
-from collections.abc import Awaitable, Callable, Iterable, Sequence
+from bisect import bisect_left
+from collections.abc import Awaitable, Callable, Coroutine, Iterable, Iterator, Sequence
 from datetime import datetime, timezone
-from functools import cache
+from email.utils import parsedate_to_datetime
+from functools import lru_cache, partial
 from hashlib import sha256
+from itertools import islice
 from pathlib import Path
-from typing import Any, TypeGuard, TypeVar
+from typing import Any, Literal, TypeGuard, TypeVar, cast
 
 if sys.version_info >= (3, 11):
     import tomllib
 else:  # pragma: no cover - Python <3.11
     import tomli as tomllib
 
+import httpx
 import yaml
 
+from rtx import config
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    _json_loads: Callable[[str | bytes], Any] = json.loads
+    _JSON_ACCEPTS_BUFFERS = False
+else:
+    _json_loads = orjson.loads
+    _JSON_ACCEPTS_BUFFERS = True
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - optional accelerator
+    uvloop = None
+
+try:
+    import rtoml
+except ImportError:  # pragma: no cover - optional accelerator
+    _toml_loads: Callable[[str], Any] = tomllib.loads
+else:
+    _toml_loads = rtoml.loads
+
 T = TypeVar("T")
 
 if sys.version_info >= (3, 12):  # Python 3.12+
     from itertools import batched
 else:  # pragma: no cover - fallback for Python <3.12
-    from itertools import islice as _islice
 
     def batched(iterable: Iterable[T], size: int) -> Iterable[tuple[T, ...]]:
         if size <= 0:
             raise ValueError("batch size must be positive")
         iterator = iter(iterable)
-        while True:
-            chunk = tuple(_islice(iterator, size))
-            if not chunk:
-                break
+        while chunk := tuple(islice(iterator, size)):
             yield chunk
 
 
+def run_async(main: Coroutine[Any, Any, T], *, use_uvloop: bool = True) -> T:
+    """Run ``main`` to completion on a fresh event loop, preferring uvloop when installed."""
+
+    if use_uvloop and uvloop is not None:
+        return cast(T, uvloop.run(main))
+    return asyncio.run(main)
+
+
 def utc_now() -> datetime:
     """Return a naive UTC timestamp using timezone-aware arithmetic internally."""
 
     return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
+# Statuses whose ``Retry-After`` header says when the server will accept us again.
+_RETRY_AFTER_STATUSES = frozenset({429, 503})
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Return the wait a 429/503 ``Retry-After`` header asks for, if any.
+
+    Both the delta-seconds and HTTP-date forms are accepted; dates in the past
+    yield ``0.0`` and unparseable values yield ``None``.
+    """
+
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return None
+    if exc.response.status_code not in _RETRY_AFTER_STATUSES:
+        return None
+    raw = exc.response.headers.get("Retry-After")
+    if raw is None:
+        return None
+    raw = raw.strip()
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(raw)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
 class AsyncRetry:
+    """Retry an awaitable factory with capped, jittered backoff.
+
+    ``backoff="exponential"`` doubles the delay per attempt while ``"linear"``
+    grows it by ``delay`` each time. ``attempt_timeout`` bounds every attempt
+    so a stalled connection is abandoned and retried instead of hanging. A
+    429/503 ``Retry-After`` header stretches the wait to at least what the
+    server asked for, still capped at ``max_delay``.
+    """
+
     def __init__(
         self,
         retries: int,
         delay: float,
         *,
         exceptions: tuple[type[Exception], ...] = (Exception,),
+        backoff: Literal["linear", "exponential"] = "exponential",
+        jitter: float = 0.1,
+        max_delay: float = 30.0,
+        attempt_timeout: float | None = None,
     ) -> None:
+        if not 0 <= jitter < 1:
+            raise ValueError("jitter must be within [0, 1)")
         self.retries = retries
         self.delay = delay
-        self._exceptions = exceptions
+        self.backoff = backoff
+        self.jitter = jitter
+        self.max_delay = max_delay
+        self.attempt_timeout = attempt_timeout
+        self._exceptions: tuple[type[Exception], ...] = (
+            (*exceptions, asyncio.TimeoutError) if attempt_timeout is not None else exceptions
+        )
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Return the sleep before retry number ``attempt`` (1-based)."""
+
+        if self.backoff == "linear":
+            base = self.delay * attempt
+        else:
+            base = self.delay * 2 ** (attempt - 1)
+        capped = min(self.max_delay, base)
+        if self.jitter:
+            capped *= 1 + random.uniform(-self.jitter, self.jitter)  # noqa: S311
+        return max(0.0, capped)
 
     async def __call__(self, task: Callable[[], Awaitable[T]]) -> T:
         attempt = 0
         while True:
             try:
-                return await task()
+                if self.attempt_timeout is None:
+                    return await task()
+                return await asyncio.wait_for(task(), self.attempt_timeout)
             except asyncio.CancelledError:
                 raise
-            except self._exceptions:
+            except self._exceptions as exc:
                 attempt += 1
                 if attempt > self.retries:
                     raise
-                await asyncio.sleep(self.delay * attempt)
+                await asyncio.sleep(self._retry_delay(attempt, exc))
+
+    def _retry_delay(self, attempt: int, exc: BaseException) -> float:
+        delay = self.backoff_delay(attempt)
+        requested = retry_after_seconds(exc)
+        if requested is not None:
+            delay = max(delay, min(requested, self.max_delay))
+        return delay
 
+    async def map(
+        self,
+        tasks: Iterable[Callable[[], Awaitable[T]]],
+        *,
+        concurrency: int,
+    ) -> list[T]:
+        """Run every task factory under this retry policy, ``concurrency`` at a time.
+
+        Each task retries independently; results keep the submission order.
+        """
+
+        return await gather_bounded(
+            (partial(self, task) for task in tasks), concurrency=concurrency
+        )
+
+
+async def gather_bounded(
+    tasks: Iterable[Callable[[], Awaitable[T]]],
+    *,
+    concurrency: int,
+) -> list[T]:
+    """Await every task factory with at most ``concurrency`` running at once.
+
+    Results keep the submission order. The first failure cancels the rest
+    (``TaskGroup``) on Python 3.11+.
+    """
+
+    if concurrency <= 0:
+        raise ValueError("concurrency must be positive")
+    factories = list(tasks)
+    results: list[T | None] = [None] * len(factories)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index: int, task: Callable[[], Awaitable[T]]) -> None:
+        async with semaphore:
+            results[index] = await task()
+
+    task_group_cls = getattr(asyncio, "TaskGroup", None)
+    if task_group_cls is not None:
+        tg = cast(Any, task_group_cls())
+        async with tg:
+            for index, task in enumerate(factories):
+                tg.create_task(run(index, task))
+    else:  # pragma: no cover - Python <3.11 fallback
+        await asyncio.gather(*(run(index, task) for index, task in enumerate(factories)))
+    return cast(list[T], results)
+
+
+def sha256_digest(content: bytes | bytearray | memoryview) -> str:
+    """Return the hex SHA-256 digest of ``content`` without copying the buffer.
+
+    ``hashlib`` delegates to OpenSSL, which already dispatches to SHA-NI/ARMv8
+    crypto extensions at runtime, so buffers are hashed in place.
+    """
 
-def sha256_digest(content: bytes) -> str:
     return sha256(content).hexdigest()
 
 
-def safe_json_loads(content: str) -> Any:
-    return json.loads(content)
+@lru_cache(maxsize=1)
+def shared_ssl_context() -> ssl.SSLContext:
+    """Return one verified TLS context for every HTTP client in the process.
+
+    Loading the CA bundle dominates ``httpx.AsyncClient`` construction, so
+    clients pass this as ``verify=`` instead of building their own.
+    """
+
+    return httpx.create_ssl_context()
+
+
+def build_http_client(*, timeout: float) -> httpx.AsyncClient:
+    """Create the pooled ``httpx.AsyncClient`` used for registry and advisory APIs."""
+
+    return httpx.AsyncClient(
+        timeout=timeout,
+        headers={"User-Agent": config.USER_AGENT},
+        http2=config.HTTP2,
+        verify=shared_ssl_context(),
+        limits=httpx.Limits(
+            max_connections=config.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def safe_json_loads(content: str | bytes) -> Any:
+    return _json_loads(content)
+
+
+_MMAP_THRESHOLD = 64 * 1024
+
+
+def _load_mapped_json(path: Path) -> Any:
+    with (
+        path.open("rb") as handle,
+        mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+        memoryview(mapped) as view,
+    ):
+        return _json_loads(cast(bytes, view))
 
 
 def read_json(path: Path) -> Any:
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
+        if _JSON_ACCEPTS_BUFFERS and path.stat().st_size >= _MMAP_THRESHOLD:
+            return _load_mapped_json(path)
+        return _json_loads(path.read_bytes())
     except json.JSONDecodeError as exc:  # pragma: no cover - logged by caller
         raise ValueError(f"Invalid JSON in {path}") from exc
 
 
 def read_yaml(path: Path) -> Any:
     try:
-        return yaml.safe_load(path.read_text(encoding="utf-8"))
+        # The loader reads and decodes the byte stream incrementally.
+        with path.open("rb") as handle:
+            return yaml.load(handle, Loader=_YamlLoader)
     except yaml.YAMLError as exc:  # pragma: no cover
         raise ValueError(f"Invalid YAML in {path}") from exc
 
 
 def read_toml(path: Path) -> Any:
     try:
-        return tomllib.loads(path.read_text(encoding="utf-8"))
+        return _toml_loads(path.read_text(encoding="utf-8"))
     except (tomllib.TOMLDecodeError, ValueError):
         return {}
 
 
-def detect_files(root: Path, patterns: Sequence[str]) -> list[Path]:
-    matches: list[Path] = []
+@lru_cache(maxsize=128)
+def _compile_patterns(
+    patterns: tuple[str, ...],
+) -> tuple[tuple[str, ...], re.Pattern[str] | None, tuple[str, ...]]:
+    """Split ``patterns`` into literals, one combined top-level matcher, and nested globs."""
+
+    literals: list[str] = []
+    flat: list[str] = []
+    nested: list[str] = []
     for pattern in patterns:
-        if any(char in pattern for char in "*?["):
-            matches.extend(root.glob(pattern))
+        if not ("*" in pattern or "?" in pattern or "[" in pattern):
+            literals.append(pattern)
+        elif "/" in pattern:
+            nested.append(pattern)
         else:
-            candidate = root / pattern
-            if candidate.exists():
-                matches.append(candidate)
-    return sorted(set(matches))
+            flat.append(fnmatch.translate(pattern))
+    matcher = re.compile("|".join(flat)) if flat else None
+    return tuple(literals), matcher, tuple(nested)
+
+
+def _scan_matching(root: Path, matcher: re.Pattern[str]) -> Iterator[Path]:
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if matcher.match(entry.name):
+                    yield root / entry.name
+    except OSError:
+        return
+
+
+def detect_files(root: Path, patterns: Sequence[str]) -> list[Path]:
+    literals, matcher, nested = _compile_patterns(tuple(patterns))
+    matches: dict[Path, None] = {}
+    for pattern in literals:
+        candidate = root / pattern
+        if candidate.exists():
+            matches[candidate] = None
+    if matcher is not None:
+        matches.update(dict.fromkeys(_scan_matching(root, matcher)))
+    for pattern in nested:
+        matches.update(dict.fromkeys(root.glob(pattern)))
+    return sorted(matches)
 
 
 def has_matching_file(root: Path, patterns: Sequence[str]) -> bool:
-    for pattern in patterns:
-        if any(char in pattern for char in "*?["):
-            iterator = root.glob(pattern)
-            try:
-                next(iterator)
-                return True
-            except StopIteration:
-                continue
-        else:
-            if (root / pattern).exists():
-                return True
-    return False
+    literals, matcher, nested = _compile_patterns(tuple(patterns))
+    if any((root / pattern).exists() for pattern in literals):
+        return True
+    if matcher is not None and next(_scan_matching(root, matcher), None) is not None:
+        return True
+    return any(next(root.glob(pattern), None) is not None for pattern in nested)
+
+
+_SLUG_SEPARATORS = re.compile(r"[^a-z0-9]+")
+_SLUG_DASH_RUNS = re.compile(rb"-{2,}")
+# Lowercases ASCII letters, keeps digits, and maps every other byte to "-".
+_SLUG_ASCII_TABLE = bytes(
+    ord(char.lower()) if char.isascii() and char.isalnum() else ord("-")
+    for char in map(chr, range(256))
+)
 
 
 def slugify(value: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-")
+    if value.isascii():
+        translated = value.encode("ascii").translate(_SLUG_ASCII_TABLE)
+        return _SLUG_DASH_RUNS.sub(b"-", translated).strip(b"-").decode("ascii")
+    # Non-ASCII input may lowercase into ASCII (e.g. KELVIN SIGN -> "k").
+    return _SLUG_SEPARATORS.sub("-", value.lower()).strip("-")
 
 
 def chunked(iterable: Iterable[T], size: int) -> Iterable[list[T]]:
     if size <= 0:
         raise ValueError("chunk size must be positive")
-    for chunk in batched(iterable, size):
-        yield list(chunk)
+    if isinstance(iterable, list):
+        for start in range(0, len(iterable), size):
+            yield iterable[start : start + size]
+        return
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
 
 
 def multiline(text: str) -> str:
-    return textwrap.dedent(text).strip()
+    """Strip the common leading whitespace (as ``textwrap.dedent`` does) and trim."""
+
+    lines = text.split("\n")
+    indents = [line[: len(line) - len(line.lstrip(" \t"))] for line in lines if line.strip(" \t")]
+    margin = len(os.path.commonprefix(indents)) if indents else 0  # noqa: RUF071
+    return "\n".join(line[margin:] if line.strip(" \t") else "" for line in lines).strip()
 
 
 def unique_preserving_order(
@@ -147,68 +404,133 @@ def unique_preserving_order(
     *,
     key: Callable[[T], Any] | None = None,
 ) -> list[T]:
-    seen: dict[Any, None] = {}
+    if key is None:
+        return list(dict.fromkeys(values))
+    seen: set[Any] = set()
+    mark = seen.add
     output: list[T] = []
+    append = output.append
     for value in values:
-        marker = key(value) if key else value
+        marker = key(value)
         if marker in seen:
             continue
-        seen[marker] = None
-        output.append(value)
+        mark(marker)
+        append(value)
     return output
 
 
 def is_non_string_sequence(value: object) -> TypeGuard[Sequence[object]]:
     """Return True when ``value`` is a non-string/bytes sequence."""
 
-    return isinstance(value, Sequence) and not isinstance(value, str | bytes | bytearray)
+    # Concrete checks first: the Sequence ABC check is comparatively slow.
+    if isinstance(value, list | tuple):
+        return True
+    if isinstance(value, str | bytes | bytearray):
+        return False
+    return isinstance(value, Sequence)
+
+
+_RESOURCE_CACHE_SIZE = 64
+_resource_cache: dict[tuple[str, str, int, int], Any] = {}
+
+
+def _load_cached_resource(path: Path, kind: str, loader: Callable[[Path], Any]) -> Any:
+    """Parse ``path`` once per (mtime, size) revision, evicting the oldest entries first."""
+
+    stat = path.stat()
+    key = (kind, str(path), stat.st_mtime_ns, stat.st_size)
+    try:
+        return _resource_cache[key]
+    except KeyError:
+        pass
+    value = loader(path)
+    while len(_resource_cache) >= _RESOURCE_CACHE_SIZE:
+        del _resource_cache[next(iter(_resource_cache))]
+    _resource_cache[key] = value
+    return value
+
+
+def clear_resource_cache() -> None:
+    _resource_cache.clear()
 
 
-@cache
 def load_json_resource(path: Path) -> Any:
-    return json.loads(path.read_text(encoding="utf-8"))
+    return _load_cached_resource(path, "json", lambda target: _json_loads(target.read_bytes()))
 
 
-@cache
 def load_yaml_resource(path: Path) -> Any:
-    return yaml.safe_load(path.read_text(encoding="utf-8"))
+    return _load_cached_resource(
+        path,
+        "yaml",
+        lambda target: yaml.load(target.read_text(encoding="utf-8"), Loader=_YamlLoader),
+    )
+
+
+_TRUTHY_VALUES = frozenset({"1", "true", "yes", "on"})
 
 
 def env_flag(name: str, default: bool = False) -> bool:
-    raw = os.getenv(name)
+    raw = os.environ.get(name)
     if raw is None:
         return default
-    return raw.strip().lower() in {"1", "true", "yes", "on"}
+    return raw.strip().lower() in _TRUTHY_VALUES
 
 
 class Graph:
+    """Directed dependency graph with node names interned to integer ids.
+
+    Each adjacency list is kept ordered by target name at insertion time, so
+    exports are a linear copy rather than a per-call sort.
+    """
+
     def __init__(self) -> None:
         self._nodes: dict[str, dict[str, Any]] = {}
-        self._edges: dict[str, set[str]] = defaultdict(set)
+        self._ids: dict[str, int] = {}
+        self._names: list[str] = []
+        self._edges: dict[int, list[int]] = {}
         self._edge_count = 0
 
+    def _intern(self, key: str) -> int:
+        node_id = self._ids.get(key)
+        if node_id is None:
+            node_id = len(self._names)
+            self._ids[key] = node_id
+            self._names.append(key)
+        return node_id
+
     def add_node(self, key: str, metadata: dict[str, Any]) -> None:
         node = self._nodes.setdefault(key, {})
         node.update(metadata)
 
     def add_edge(self, src: str, dest: str) -> None:
-        edges = self._edges[src]
-        if dest not in edges:
-            edges.add(dest)
-            self._edge_count += 1
+        targets = self._edges.setdefault(self._intern(src), [])
+        dest_id = self._intern(dest)
+        index = bisect_left(targets, dest, key=self._names.__getitem__)
+        if index < len(targets) and targets[index] == dest_id:
+            return
+        targets.insert(index, dest_id)
+        self._edge_count += 1
+
+    def _targets(self, src_id: int) -> list[str]:
+        names = self._names
+        return [names[dest_id] for dest_id in self._edges[src_id]]
 
     def to_dict(self) -> dict[str, Any]:
+        names = self._names
         return {
             "nodes": {key: dict(value) for key, value in self._nodes.items()},
             "edges": {
-                key: sorted(values)
-                for key, values in self._edges.items()
-                if values
+                names[src_id]: self._targets(src_id)
+                for src_id, targets in self._edges.items()
+                if targets
             },
         }
 
     def dependencies_of(self, key: str) -> list[str]:
-        return sorted(self._edges.get(key, set()))
+        src_id = self._ids.get(key)
+        if src_id is None or src_id not in self._edges:
+            return []
+        return self._targets(src_id)
 
     def __len__(self) -> int:
         return len(self._nodes)
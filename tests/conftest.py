@@ -3,7 +3,23 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 SRC = ROOT / "src"
 if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
+
+# Read when clients are constructed rather than at import, so they can leak in
+# from the invoking shell or from another test.
+_HERMETIC_ENV = (
+    "GITHUB_TOKEN",
+    "RTX_GITHUB_TOKEN",
+    "RTX_DISABLE_GITHUB_ADVISORIES",
+)
+
+
+@pytest.fixture(autouse=True)
+def _hermetic_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    for name in _HERMETIC_ENV:
+        monkeypatch.delenv(name, raising=False)
@@ -1,34 +1,163 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import threading
 import uuid
+from collections.abc import AsyncIterator
 from pathlib import Path
+from types import SimpleNamespace
 
 import httpx
 import pytest
 
 from rtx import config
-from rtx.advisory import AdvisoryClient
+from rtx.advisory import (
+    AdvisoryClient,
+    _extract_numeric_score,
+    _iter_osv_results,
+    _severity_from_github,
+    _severity_from_label,
+    _severity_from_osv,
+    _version_in_range,
+)
 from rtx.models import Advisory, Dependency, Severity
 
 
 class _FakeResponse:
     def __init__(self, payload: dict | None = None, *, status_code: int = 200) -> None:
-        self._payload = payload or {"data": {"securityVulnerabilities": {"nodes": []}}}
+        self._payload = payload or {"data": {}}
         self.status_code = status_code
 
     def raise_for_status(self) -> None:
         if self.status_code >= 400:
             raise RuntimeError(f"HTTP {self.status_code}")
 
+    @property
+    def content(self) -> bytes:
+        return json.dumps(self._payload).encode()
+
     def json(self) -> dict:
         return self._payload
 
 
+class _ReplayPost:
+    """Stand-in for ``AsyncClient.post`` that replays canned responses in order.
+
+    The last response is reused once the sequence is exhausted; every JSON
+    payload is recorded for assertions.
+    """
+
+    def __init__(self, *responses: _FakeResponse | httpx.Response) -> None:
+        self._responses = list(responses) or [_FakeResponse()]
+        self.payloads: list[dict | None] = []
+
+    @property
+    def call_count(self) -> int:
+        return len(self.payloads)
+
+    async def __call__(
+        self, url: str, *, json: dict | None = None, **_: object
+    ) -> _FakeResponse | httpx.Response:
+        index = min(len(self.payloads), len(self._responses) - 1)
+        self.payloads.append(json)
+        return self._responses[index]
+
+
+@pytest.fixture
+async def advisory_client() -> AsyncIterator[AdvisoryClient]:
+    """A default-configured client, closed after the test.
+
+    Tests that patch ``config`` before construction build their own client,
+    since cache sizes and concurrency limits are read in ``__init__``.
+    """
+
+    async with AdvisoryClient() as client:
+        yield client
+
+
+def _osv_hit(identifier: str, score: object) -> _FakeResponse:
+    vuln = {"id": identifier, "summary": "", "severity": [{"score": score}]}
+    return _FakeResponse({"results": [{"vulns": [vuln]}]})
+
+
+@pytest.mark.asyncio
+async def test_injected_http_client_is_left_open() -> None:
+    async with httpx.AsyncClient() as shared:
+        async with AdvisoryClient(client=shared) as client:
+            assert client._client is shared
+        assert not shared.is_closed
+
+    owned = AdvisoryClient()
+    await owned.close()
+    assert owned._client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_retry_bounds_each_attempt() -> None:
+    async with AdvisoryClient(attempt_timeout=2.5) as client:
+        assert client._retry.attempt_timeout == 2.5
+    async with AdvisoryClient() as client:
+        assert client._retry.attempt_timeout == config.HTTP_ATTEMPT_TIMEOUT
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        pytest.param(7, 7.0, id="int"),
+        pytest.param(" 5.5 ", 5.5, id="numeric-string"),
+        pytest.param("CVSS:3.1/AV:N/AC:L", 0.0, id="cvss-vector"),
+        pytest.param("score 8.1 (high)", 8.1, id="embedded-number"),
+        pytest.param("n/a", 0.0, id="no-number"),
+        pytest.param(True, 0.0, id="bool"),
+        pytest.param(None, 0.0, id="missing"),
+    ],
+)
+def test_extract_numeric_score(raw: object, expected: float) -> None:
+    assert _extract_numeric_score(raw) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    ("label", "from_label", "from_github"),
+    [
+        pytest.param("CRITICAL", Severity.CRITICAL, Severity.CRITICAL, id="critical"),
+        pytest.param(" Moderate ", Severity.MEDIUM, Severity.MEDIUM, id="moderate"),
+        pytest.param("low", Severity.LOW, Severity.LOW, id="low"),
+        pytest.param("unknown", Severity.NONE, Severity.LOW, id="unknown"),
+        pytest.param(None, Severity.NONE, Severity.LOW, id="missing"),
+    ],
+)
+def test_severity_from_labels(
+    label: str | None, from_label: Severity, from_github: Severity
+) -> None:
+    assert _severity_from_label(label) is from_label
+    assert _severity_from_github(label) is from_github
+
+
+@pytest.mark.parametrize(
+    ("entry", "expected"),
+    [
+        pytest.param({"severity": [{"score": "9.8"}]}, Severity.CRITICAL, id="critical"),
+        pytest.param(
+            {"severity": [{"score": "4.0"}, {"score": 7.2}]}, Severity.HIGH, id="max-score"
+        ),
+        pytest.param({"severity": [{"score": "2"}]}, Severity.LOW, id="low"),
+        pytest.param(
+            {"severity": "9.8", "database_specific": {"severity": "MODERATE"}},
+            Severity.MEDIUM,
+            id="label-fallback",
+        ),
+        pytest.param({}, Severity.NONE, id="empty"),
+    ],
+)
+def test_severity_from_osv(entry: dict[str, object], expected: Severity) -> None:
+    assert _severity_from_osv(entry) is expected
+
+
 @pytest.mark.asyncio
 async def test_osv_queries_use_expected_ecosystem_names(
-    monkeypatch, tmp_path: Path
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
 ) -> None:
-    client = AdvisoryClient()
     captured: list[dict] = []
 
     async def fake_post(
@@ -39,16 +168,13 @@ async def test_osv_queries_use_expected_ecosystem_names(
         results = {"results": [{} for _ in json["queries"]]}
         return _FakeResponse(results)
 
-    monkeypatch.setattr(client._client, "post", fake_post)
+    monkeypatch.setattr(advisory_client._client, "post", fake_post)
     dependencies = [
         Dependency("pypi", "requests", "2.31.0", True, tmp_path),
         Dependency("crates", "serde", "1.0.0", True, tmp_path),
     ]
 
-    try:
-        await client._query_osv(dependencies)
-    finally:
-        await client.close()
+    await advisory_client._query_osv(dependencies)
 
     ecosystems = [query["package"]["ecosystem"] for query in captured[0]["queries"]]
     assert ecosystems == ["PyPI", "crates.io"]
@@ -56,9 +182,8 @@ async def test_osv_queries_use_expected_ecosystem_names(
 
 @pytest.mark.asyncio
 async def test_osv_query_skips_unsupported_ecosystems(
-    monkeypatch, tmp_path: Path
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
 ) -> None:
-    client = AdvisoryClient()
     called = False
 
     async def fake_post(*_: object, **__: object) -> _FakeResponse:
@@ -66,16 +191,13 @@ async def test_osv_query_skips_unsupported_ecosystems(
         called = True
         return _FakeResponse({"results": []})
 
-    monkeypatch.setattr(client._client, "post", fake_post)
+    monkeypatch.setattr(advisory_client._client, "post", fake_post)
     dependencies = [
         Dependency("homebrew", "wget", "1.0.0", True, tmp_path),
         Dependency("docker", "python", "3.11", True, tmp_path),
     ]
 
-    try:
-        results = await client._query_osv(dependencies)
-    finally:
-        await client.close()
+    results = await advisory_client._query_osv(dependencies)
 
     assert called is False
     assert results == {
@@ -85,9 +207,9 @@ async def test_osv_query_skips_unsupported_ecosystems(
 
 
 @pytest.mark.asyncio
-async def test_osv_query_skips_on_client_error(monkeypatch, tmp_path: Path) -> None:
-    client = AdvisoryClient()
-
+async def test_osv_query_skips_on_client_error(
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
+) -> None:
     request = httpx.Request("POST", config.OSV_API_URL)
     response = httpx.Response(status_code=400, request=request)
 
@@ -103,13 +225,10 @@ async def test_osv_query_skips_on_client_error(monkeypatch, tmp_path: Path) -> N
     async def fake_post(*_: object, **__: object) -> _Failure:
         return _Failure()
 
-    monkeypatch.setattr(client._client, "post", fake_post)
+    monkeypatch.setattr(advisory_client._client, "post", fake_post)
     dependencies = [Dependency("pypi", "requests", "2.31.0", True, tmp_path)]
 
-    try:
-        results = await client._query_osv(dependencies)
-    finally:
-        await client.close()
+    results = await advisory_client._query_osv(dependencies)
 
     assert results == {"pypi:requests@2.31.0": []}
 
@@ -157,10 +276,12 @@ async def test_osv_query_deduplicates_dependencies(monkeypatch, tmp_path: Path)
 
 
 @pytest.mark.asyncio
-async def test_github_query_deduplicates_packages(monkeypatch, tmp_path: Path) -> None:
-    client = AdvisoryClient()
-    client._gh_token = uuid.uuid4().hex  # enable GitHub path
+async def test_github_query_deduplicates_packages(
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
+) -> None:
+    advisory_client._gh_token = uuid.uuid4().hex  # enable GitHub path
     calls = 0
+    captured: list[dict] = []
 
     async def fake_post(
         url: str,
@@ -171,9 +292,11 @@ async def test_github_query_deduplicates_packages(monkeypatch, tmp_path: Path) -
         nonlocal calls
         calls += 1
         assert headers and "Authorization" in headers
+        assert json is not None
+        captured.append(json)
         payload = {
             "data": {
-                "securityVulnerabilities": {
+                "pkg0": {
                     "nodes": [
                         {
                             "advisory": {
@@ -199,24 +322,34 @@ async def test_github_query_deduplicates_packages(monkeypatch, tmp_path: Path) -
                             "vulnerableVersionRange": ">=0",
                         },
                     ]
-                }
+                },
+                "pkg1": {"nodes": []},
             }
         }
         return _FakeResponse(payload)
 
-    monkeypatch.setattr(client._client, "post", fake_post)
+    monkeypatch.setattr(advisory_client._client, "post", fake_post)
 
     dependencies = [
         Dependency("pypi", "requests", "2.31.0", True, tmp_path),
         Dependency("pypi", "requests", "2.30.0", False, tmp_path),
+        Dependency("npm", "left-pad", "1.3.0", True, tmp_path),
     ]
 
-    try:
-        results = await client._query_github(dependencies)
-    finally:
-        await client.close()
+    results = await advisory_client._query_github(dependencies)
 
     assert calls == 1
+    [body] = captured
+    assert "pkg0: securityVulnerabilities(" in body["query"]
+    assert "pkg1: securityVulnerabilities(" in body["query"]
+    assert "pkg2:" not in body["query"]
+    assert body["variables"] == {
+        "ecosystem0": "PIP",
+        "package0": "requests",
+        "ecosystem1": "NPM",
+        "package1": "left-pad",
+    }
+    assert results["npm:left-pad@1.3.0"] == []
     first = results["pypi:requests@2.31.0"]
     second = results["pypi:requests@2.30.0"]
     assert first and second
@@ -225,42 +358,301 @@ async def test_github_query_deduplicates_packages(monkeypatch, tmp_path: Path) -
     assert first[0].references == ["https://example.com", "https://another.example"]
 
 
+@pytest.mark.parametrize(
+    ("version", "vulnerable_range", "expected"),
+    [
+        pytest.param("1.2.0", ">= 1.0, < 1.4.2", True, id="inside"),
+        pytest.param("1.4.2", ">= 1.0, < 1.4.2", False, id="upper-bound"),
+        pytest.param("0.9", ">= 1.0, < 1.4.2", False, id="below"),
+        pytest.param("0.2.0", "= 0.2.0", True, id="exact"),
+        pytest.param("2.0.0", "<= 1.0.8", False, id="above"),
+        pytest.param("1.0.0", None, True, id="no-range"),
+        pytest.param("not-a-version", "< 1.0", True, id="unparseable-version"),
+        pytest.param("1.0.0", "~> 1.0", True, id="unknown-operator"),
+    ],
+)
+def test_version_in_range(version: str, vulnerable_range: str | None, expected: bool) -> None:
+    assert _version_in_range(version, vulnerable_range) is expected
+
+
 @pytest.mark.asyncio
-async def test_osv_query_uses_cache(monkeypatch, tmp_path: Path) -> None:
-    monkeypatch.setattr(config, "OSV_CACHE_SIZE", 512)
+async def test_github_query_filters_cached_package_by_version(
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
+) -> None:
+    advisory_client._gh_token = uuid.uuid4().hex
+    node = {
+        "advisory": {"ghsaId": "GHSA-old", "summary": "", "references": []},
+        "severity": "HIGH",
+        "vulnerableVersionRange": "< 2.0.0",
+    }
+    post = _ReplayPost(_FakeResponse({"data": {"pkg0": {"nodes": [node]}}}))
+    monkeypatch.setattr(advisory_client._client, "post", post)
+    old = Dependency("pypi", "requests", "1.9.0", True, tmp_path)
+    new = Dependency("pypi", "requests", "2.31.0", True, tmp_path)
+
+    first = await advisory_client._query_github([old])
+    second = await advisory_client._query_github([old, new])
+
+    assert post.call_count == 1
+    assert [adv.identifier for adv in first[old.coordinate]] == ["GHSA-old"]
+    assert [adv.identifier for adv in second[old.coordinate]] == ["GHSA-old"]
+    assert second[new.coordinate] == []
+
+
+@pytest.mark.asyncio
+async def test_github_query_does_not_cache_graphql_errors(
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
+) -> None:
+    advisory_client._gh_token = uuid.uuid4().hex
+    node = {
+        "advisory": {"ghsaId": "GHSA-1", "summary": "", "references": []},
+        "severity": "HIGH",
+        "vulnerableVersionRange": None,
+    }
+    rate_limited = {"data": None, "errors": [{"type": "RATE_LIMITED", "message": "slow down"}]}
+    post = _ReplayPost(
+        _FakeResponse(rate_limited), _FakeResponse({"data": {"pkg0": {"nodes": [node]}}})
+    )
+    monkeypatch.setattr(advisory_client._client, "post", post)
+    dep = Dependency("pypi", "requests", "2.31.0", True, tmp_path)
+
+    first = await advisory_client._query_github([dep])
+    second = await advisory_client._query_github([dep])
+
+    assert post.call_count == 2
+    assert first[dep.coordinate] == []
+    assert [adv.identifier for adv in second[dep.coordinate]] == ["GHSA-1"]
+
+
+@pytest.mark.asyncio
+async def test_github_query_retries_aliases_that_failed_in_a_batch(
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
+) -> None:
+    advisory_client._gh_token = uuid.uuid4().hex
+    node = {
+        "advisory": {"ghsaId": "GHSA-1", "summary": "", "references": []},
+        "severity": "HIGH",
+        "vulnerableVersionRange": None,
+    }
+    partial_failure = {
+        "data": {"pkg0": {"nodes": []}, "pkg1": None},
+        "errors": [{"path": ["pkg1"], "message": "Something went wrong"}],
+    }
+    post = _ReplayPost(
+        _FakeResponse(partial_failure), _FakeResponse({"data": {"pkg0": {"nodes": [node]}}})
+    )
+    monkeypatch.setattr(advisory_client._client, "post", post)
+    clean = Dependency("pypi", "requests", "2.31.0", True, tmp_path)
+    failed = Dependency("pypi", "urllib3", "2.0.0", True, tmp_path)
+
+    await advisory_client._query_github([clean, failed])
+    second = await advisory_client._query_github([clean, failed])
+
+    assert post.call_count == 2
+    assert post.payloads[1]["variables"] == {"ecosystem0": "PIP", "package0": "urllib3"}
+    assert second[clean.coordinate] == []
+    assert [adv.identifier for adv in second[failed.coordinate]] == ["GHSA-1"]
+
+
+@pytest.mark.asyncio
+async def test_github_query_skips_ecosystems_github_does_not_cover(
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
+) -> None:
+    advisory_client._gh_token = uuid.uuid4().hex
+    post = _ReplayPost()
+    monkeypatch.setattr(advisory_client._client, "post", post)
+    dependencies = [
+        Dependency("crates", "serde", "1.0.0", True, tmp_path),
+        Dependency("docker", "python", "3.11", True, tmp_path),
+        Dependency("homebrew", "wget", "1.0.0", True, tmp_path),
+    ]
+
+    results = await advisory_client._query_github(dependencies)
+
+    [payload] = post.payloads
+    assert payload is not None
+    assert payload["variables"] == {"ecosystem0": "RUST", "package0": "serde"}
+    assert results == {dep.coordinate: [] for dep in dependencies}
+
+
+@pytest.mark.asyncio
+async def test_github_query_skips_request_for_unsupported_ecosystems(
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
+) -> None:
+    advisory_client._gh_token = uuid.uuid4().hex
+    post = _ReplayPost()
+    monkeypatch.setattr(advisory_client._client, "post", post)
+    dependencies = [
+        Dependency("docker", "python", "3.11", True, tmp_path),
+        Dependency("conda", "numpy", "1.26.0", True, tmp_path),
+    ]
+
+    results = await advisory_client._query_github(dependencies)
+
+    assert post.call_count == 0
+    assert results == {dep.coordinate: [] for dep in dependencies}
+
+
+@pytest.mark.asyncio
+async def test_github_query_maps_ecosystems_case_insensitively(
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
+) -> None:
+    advisory_client._gh_token = uuid.uuid4().hex
+    post = _ReplayPost()
+    monkeypatch.setattr(advisory_client._client, "post", post)
+
+    await advisory_client._query_github([Dependency("PyPI", "requests", "2.31.0", True, tmp_path)])
+
+    [payload] = post.payloads
+    assert payload is not None
+    assert payload["variables"]["ecosystem0"] == "PIP"
+
+
+@pytest.mark.asyncio
+async def test_github_query_respects_batch_size(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(config, "GITHUB_BATCH_SIZE", 2)
     client = AdvisoryClient()
-    calls = 0
+    client._gh_token = uuid.uuid4().hex
+    post = _ReplayPost()
+    monkeypatch.setattr(client._client, "post", post)
+    deps = [Dependency("npm", f"pkg-{idx}", "1.0.0", True, tmp_path) for idx in range(5)]
 
-    async def fake_post(
-        url: str, *, json: dict | None = None, **_: object
-    ) -> _FakeResponse:
-        nonlocal calls
-        calls += 1
-        results = {
+    try:
+        await client._query_github(deps)
+    finally:
+        await client.close()
+
+    assert [len(payload["variables"]) // 2 for payload in post.payloads if payload] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_github_query_uses_cache(
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
+) -> None:
+    advisory_client._gh_token = uuid.uuid4().hex
+    post = _ReplayPost(_FakeResponse({"data": {"pkg0": {"nodes": []}}}))
+    monkeypatch.setattr(advisory_client._client, "post", post)
+    dep = Dependency("pypi", "requests", "2.31.0", True, tmp_path)
+    newer = Dependency("pypi", "requests", "2.32.0", True, tmp_path)
+
+    await advisory_client._query_github([dep])
+    results = await advisory_client._query_github([dep, newer])
+    advisory_client.clear_cache()
+    await advisory_client._query_github([dep])
+
+    assert post.call_count == 2
+    assert results == {dep.coordinate: [], newer.coordinate: []}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("streaming", "threshold"),
+    [
+        pytest.param(False, 0, id="parsed"),
+        pytest.param(True, 0, id="streaming-flag"),
+        pytest.param(False, 1, id="streaming-threshold"),
+    ],
+)
+async def test_osv_query_parses_results_with_optional_streaming(
+    monkeypatch, tmp_path: Path, streaming: bool, threshold: int
+) -> None:
+    if streaming or threshold:
+        pytest.importorskip("ijson")
+    monkeypatch.setattr(config, "JSON_STREAMING", streaming)
+    monkeypatch.setattr(config, "JSON_STREAMING_THRESHOLD", threshold)
+    monkeypatch.setattr(config, "OSV_CACHE_SIZE", 0)
+    client = AdvisoryClient()
+
+    async def fake_post(url: str, *, json: dict | None = None, **_: object) -> httpx.Response:
+        payload = {
             "results": [
                 {
                     "vulns": [
                         {
-                            "id": "OSV-1",
-                            "summary": "",
-                            "severity": [{"score": "5.0"}],
+                            "id": "OSV-2",
+                            "summary": "Streamed",
+                            "severity": [{"score": 7.5}],
+                            "references": [{"url": "https://osv.dev/OSV-2"}],
                         }
                     ]
                 }
             ]
         }
-        return _FakeResponse(results)
+        return httpx.Response(200, json=payload, request=httpx.Request("POST", url))
 
     monkeypatch.setattr(client._client, "post", fake_post)
+    dependencies = [
+        Dependency("pypi", "requests", "2.31.0", True, tmp_path),
+        Dependency("pypi", "missing-result", "1.0.0", True, tmp_path),
+    ]
+
+    try:
+        results = await client._query_osv(dependencies)
+    finally:
+        await client.close()
+
+    [advisory] = results["pypi:requests@2.31.0"]
+    assert advisory.identifier == "OSV-2"
+    assert advisory.severity is Severity.HIGH
+    assert advisory.references == ["https://osv.dev/OSV-2"]
+    assert results["pypi:missing-result@1.0.0"] == []
+
+
+@pytest.mark.parametrize("streaming", [False, True], ids=["parsed", "streaming"])
+def test_iter_osv_results_rejects_truncated_json(monkeypatch, streaming: bool) -> None:
+    if streaming:
+        pytest.importorskip("ijson")
+    monkeypatch.setattr(config, "JSON_STREAMING", streaming)
+    monkeypatch.setattr(config, "JSON_STREAMING_THRESHOLD", 0)
+    response = httpx.Response(200, content=b'{"results": [{"vulns": [{"id": "OSV-1"')
+
+    with pytest.raises(json.JSONDecodeError):
+        list(_iter_osv_results(response))
+
+
+@pytest.mark.asyncio
+async def test_osv_query_uses_cache(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(config, "OSV_CACHE_SIZE", 512)
+    client = AdvisoryClient()
+    post = _ReplayPost(_osv_hit("OSV-1", "5.0"))
+    monkeypatch.setattr(client._client, "post", post)
     dependencies = [Dependency("pypi", "requests", "2.31.0", True, tmp_path)]
 
     try:
-        await client._query_osv(dependencies)
-        await client._query_osv(dependencies)
+        first = await client._query_osv(dependencies)
+        first["pypi:requests@2.31.0"].clear()
+        second = await client._query_osv(dependencies)
     finally:
         await client.close()
 
-    assert calls == 1
+    assert post.call_count == 1
+    assert [adv.identifier for adv in second["pypi:requests@2.31.0"]] == ["OSV-1"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_advisories_results_do_not_alias_the_cache(
+    monkeypatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(config, "OSV_CACHE_SIZE", 512)
+    monkeypatch.setenv("RTX_DISABLE_GITHUB_ADVISORIES", "1")
+    client = AdvisoryClient()
+    post = _ReplayPost(_osv_hit("OSV-1", "5.0"))
+    monkeypatch.setattr(client._client, "post", post)
+    dependency = Dependency("pypi", "requests", "2.31.0", True, tmp_path)
+
+    try:
+        first = await client.fetch_advisories([dependency])
+        first[dependency.coordinate][0].references.append("https://caller.example")
+        first[dependency.coordinate][0].summary = "edited by caller"
+        second = await client.fetch_advisories([dependency])
+    finally:
+        await client.close()
+
+    assert post.call_count == 1
+    advisory = second[dependency.coordinate][0]
+    assert advisory is not first[dependency.coordinate][0]
+    assert "https://caller.example" not in advisory.references
+    assert advisory.summary != "edited by caller"
 
 
 @pytest.mark.asyncio
@@ -310,34 +702,102 @@ async def test_fetch_advisories_respects_disable_flag(
     assert results["pypi:requests@2.31.0"] == []
 
 
+@pytest.mark.asyncio
+async def test_fetch_advisories_without_dependencies_skips_providers(
+    advisory_client: AdvisoryClient, monkeypatch
+) -> None:
+    advisory_client._gh_token = uuid.uuid4().hex
+    post = _ReplayPost()
+    monkeypatch.setattr(advisory_client._client, "post", post)
+
+    assert await advisory_client.fetch_advisories([]) == {}
+    assert await advisory_client._query_github([]) == {}
+    assert post.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_fetch_advisories_collapses_duplicate_coordinates(
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
+) -> None:
+    advisory_client._gh_token = uuid.uuid4().hex
+    seen: dict[str, list[list[Dependency]]] = {"osv": [], "github": []}
+
+    async def fake_osv(deps: list[Dependency]) -> dict:
+        seen["osv"].append(deps)
+        return {}
+
+    async def fake_github(deps: list[Dependency]) -> dict:
+        seen["github"].append(deps)
+        return {}
+
+    monkeypatch.setattr(advisory_client, "_query_osv", fake_osv)
+    monkeypatch.setattr(advisory_client, "_query_github", fake_github)
+    primary = Dependency("npm", "demo", "1.0.0", True, tmp_path / "package.json")
+    duplicate = Dependency("npm", "demo", "1.0.0", False, tmp_path / "sub" / "package.json")
+
+    results = await advisory_client.fetch_advisories([primary, duplicate])
+
+    assert seen == {"osv": [[primary]], "github": [[primary]]}
+    assert results == {primary.coordinate: []}
+
+
+@pytest.mark.asyncio
+async def test_fetch_advisories_queries_providers_concurrently(
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
+) -> None:
+    advisory_client._gh_token = uuid.uuid4().hex
+    github_started = asyncio.Event()
+
+    async def fake_osv(_: list[Dependency]) -> dict:
+        # Only completes if the GitHub query is already in flight.
+        await asyncio.wait_for(github_started.wait(), timeout=1)
+        return {}
+
+    async def fake_github(_: list[Dependency]) -> dict:
+        github_started.set()
+        return {}
+
+    monkeypatch.setattr(advisory_client, "_query_osv", fake_osv)
+    monkeypatch.setattr(advisory_client, "_query_github", fake_github)
+    dependency = Dependency("pypi", "requests", "2.31.0", True, tmp_path)
+
+    results = await advisory_client.fetch_advisories([dependency])
+
+    assert results == {dependency.coordinate: []}
+
+
+@pytest.mark.asyncio
+async def test_fetch_advisories_settles_github_before_osv_failure_propagates(
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
+) -> None:
+    advisory_client._gh_token = uuid.uuid4().hex
+    github_finished = False
+
+    async def failing_osv(_: list[Dependency]) -> dict:
+        raise httpx.ConnectError("osv unreachable")
+
+    async def slow_github(_: list[Dependency]) -> dict:
+        nonlocal github_finished
+        await asyncio.sleep(0.01)
+        github_finished = True
+        return {}
+
+    monkeypatch.setattr(advisory_client, "_query_osv", failing_osv)
+    monkeypatch.setattr(advisory_client, "_query_github", slow_github)
+    dependency = Dependency("pypi", "requests", "2.31.0", True, tmp_path)
+
+    with pytest.raises(httpx.ConnectError):
+        await advisory_client.fetch_advisories([dependency])
+
+    assert github_finished
+
+
 @pytest.mark.asyncio
 async def test_osv_cache_lru_eviction(monkeypatch, tmp_path: Path) -> None:
     monkeypatch.setattr(config, "OSV_CACHE_SIZE", 1)
     client = AdvisoryClient()
-    calls = 0
-
-    async def fake_post(
-        url: str, *, json: dict | None = None, **_: object
-    ) -> _FakeResponse:
-        nonlocal calls
-        calls += 1
-        return _FakeResponse(
-            {
-                "results": [
-                    {
-                        "vulns": [
-                            {
-                                "id": "OSV-1",
-                                "summary": "",
-                                "severity": [{"score": "4.1"}],
-                            }
-                        ]
-                    }
-                ]
-            }
-        )
-
-    monkeypatch.setattr(client._client, "post", fake_post)
+    post = _ReplayPost(_osv_hit("OSV-1", "4.1"))
+    monkeypatch.setattr(client._client, "post", post)
 
     dep_a = Dependency("pypi", "pkg-a", "1.0.0", True, tmp_path)
     dep_b = Dependency("pypi", "pkg-b", "1.0.0", True, tmp_path)
@@ -349,27 +809,244 @@ async def test_osv_cache_lru_eviction(monkeypatch, tmp_path: Path) -> None:
     finally:
         await client.close()
 
-    assert calls == 3
+    assert post.call_count == 3
 
 
 @pytest.mark.asyncio
-async def test_osv_batch_size_respects_config(monkeypatch, tmp_path: Path) -> None:
-    monkeypatch.setattr(config, "OSV_BATCH_SIZE", 1)
+async def test_osv_cache_entries_expire_after_ttl(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(config, "ADVISORY_CACHE_TTL", 60)
+    clock = [1000.0]
+    monkeypatch.setattr("rtx.advisory.time", SimpleNamespace(monotonic=lambda: clock[0]))
+    client = AdvisoryClient()
+    post = _ReplayPost(_osv_hit("OSV-1", "4.1"))
+    monkeypatch.setattr(client._client, "post", post)
+    dep = Dependency("pypi", "pkg-a", "1.0.0", True, tmp_path)
+
+    try:
+        await client._query_osv([dep])
+        clock[0] += 59
+        await client._query_osv([dep])
+        assert post.call_count == 1
+        clock[0] += 1
+        await client._query_osv([dep])
+    finally:
+        await client.close()
+
+    assert post.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_osv_disk_cache_is_reused_across_clients(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(config, "ADVISORY_DISK_CACHE", True)
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path / "cache")
+    post = _ReplayPost(_osv_hit("OSV-1", "9.1"))
+    dep = Dependency("pypi", "pkg-a", "1.0.0", True, tmp_path)
+
+    outcomes = []
+    for _ in range(2):
+        async with AdvisoryClient() as client:
+            monkeypatch.setattr(client._client, "post", post)
+            outcomes.append(await client._query_osv([dep]))
+
+    assert post.call_count == 1
+    assert outcomes[0] == outcomes[1]
+    [advisory] = outcomes[1][dep.coordinate]
+    assert (advisory.identifier, advisory.severity) == ("OSV-1", Severity.CRITICAL)
+    assert (tmp_path / "cache" / "advisories.sqlite3").exists()
+
+
+@pytest.mark.asyncio
+async def test_osv_disk_cache_runs_off_the_event_loop(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(config, "ADVISORY_DISK_CACHE", True)
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path)
+    loop_thread = threading.get_ident()
+    threads: dict[str, int] = {}
+
+    async with AdvisoryClient() as client:
+        disk_cache = client._osv_disk_cache
+        assert disk_cache is not None
+        for name in ("get_many", "put_many"):
+            method = getattr(disk_cache, name)
+
+            def record(*args, _name=name, _method=method):
+                threads[_name] = threading.get_ident()
+                return _method(*args)
+
+            monkeypatch.setattr(disk_cache, name, record)
+        monkeypatch.setattr(client._client, "post", _ReplayPost(_osv_hit("OSV-1", "4.1")))
+        await client._query_osv([Dependency("pypi", "pkg-a", "1.0.0", True, tmp_path)])
+
+    assert set(threads) == {"get_many", "put_many"}
+    assert loop_thread not in threads.values()
+
+
+@pytest.mark.asyncio
+async def test_osv_disk_cache_keeps_concurrent_queries_single_flight(
+    monkeypatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(config, "ADVISORY_DISK_CACHE", True)
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path)
+    post = _ReplayPost(_osv_hit("OSV-1", "4.1"))
+    dep = Dependency("pypi", "pkg-a", "1.0.0", True, tmp_path)
+
+    async with AdvisoryClient() as client:
+        monkeypatch.setattr(client._client, "post", post)
+        first, second = await asyncio.gather(
+            client._query_osv([dep]), client._query_osv([dep])
+        )
+        assert client._osv_inflight == {}
+
+    assert post.call_count == 1
+    assert first == second
+    assert [advisory.identifier for advisory in first[dep.coordinate]] == ["OSV-1"]
+
+
+@pytest.mark.asyncio
+async def test_osv_disk_cache_expires_and_skips_refused_lookups(
+    monkeypatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(config, "ADVISORY_DISK_CACHE", True)
+    monkeypatch.setattr(config, "ADVISORY_CACHE_TTL", 60)
+    monkeypatch.setattr(config, "CACHE_DIR", tmp_path)
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(
+        "rtx.advisory.time",
+        SimpleNamespace(time=lambda: clock.now, monotonic=lambda: clock.now),
+    )
+    dep = Dependency("pypi", "pkg-a", "1.0.0", True, tmp_path)
+
+    refused = _ReplayPost(
+        httpx.Response(404, request=httpx.Request("POST", config.OSV_API_URL))
+    )
+    answered = _ReplayPost(_osv_hit("OSV-1", "4.1"))
+
+    for post in (refused, answered, answered):
+        async with AdvisoryClient() as client:
+            monkeypatch.setattr(client._client, "post", post)
+            await client._query_osv([dep])
+
+    assert (refused.call_count, answered.call_count) == (1, 1)
+
+    clock.now += 60
+    async with AdvisoryClient() as client:
+        monkeypatch.setattr(client._client, "post", answered)
+        await client._query_osv([dep])
+
+    assert answered.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_osv_queries_share_inflight_request(
+    monkeypatch, tmp_path: Path
+) -> None:
     monkeypatch.setattr(config, "OSV_CACHE_SIZE", 0)
     client = AdvisoryClient()
-    calls = 0
-    batch_lengths: list[int] = []
+    post = _ReplayPost(_osv_hit("OSV-1", "4.1"))
+    monkeypatch.setattr(client._client, "post", post)
+    dep = Dependency("pypi", "pkg-a", "1.0.0", True, tmp_path)
 
-    async def fake_post(
-        url: str, *, json: dict | None = None, **_: object
-    ) -> _FakeResponse:
-        nonlocal calls
-        calls += 1
-        assert json is not None
-        batch_lengths.append(len(json.get("queries", [])))
-        return _FakeResponse({"results": [{}]})
+    try:
+        first, second = await asyncio.gather(
+            client._query_osv([dep]), client._query_osv([dep])
+        )
+    finally:
+        await client.close()
 
-    monkeypatch.setattr(client._client, "post", fake_post)
+    assert post.call_count == 1
+    assert [adv.identifier for adv in first[dep.coordinate]] == ["OSV-1"]
+    assert second == first
+    assert client._osv_inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_owner_does_not_cancel_borrowers(monkeypatch, tmp_path: Path) -> None:
+    replay = _ReplayPost(_osv_hit("OSV-1", "4.1"))
+    started = asyncio.Event()
+
+    async def post(url: str, **kwargs: object) -> _FakeResponse | httpx.Response:
+        if replay.call_count == 0:
+            started.set()
+            replay.payloads.append(None)
+            await asyncio.sleep(10)
+        return await replay(url, **kwargs)
+
+    dep = Dependency("pypi", "pkg-a", "1.0.0", True, tmp_path)
+    async with AdvisoryClient() as client:
+        monkeypatch.setattr(client._client, "post", post)
+        owner = asyncio.create_task(client._query_osv([dep]))
+        await started.wait()
+        borrower = asyncio.create_task(client._query_osv([dep]))
+        await asyncio.sleep(0)
+        owner.cancel()
+
+        result = await asyncio.wait_for(borrower, 5)
+
+    assert owner.cancelled()
+    assert replay.call_count == 2
+    assert [advisory.identifier for advisory in result[dep.coordinate]] == ["OSV-1"]
+    assert client._osv_inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_osv_queries_share_inflight_failure(
+    monkeypatch, tmp_path: Path
+) -> None:
+    client = AdvisoryClient(retries=0)
+    post = _ReplayPost(_FakeResponse(status_code=500))
+    monkeypatch.setattr(client._client, "post", post)
+    dep = Dependency("pypi", "pkg-a", "1.0.0", True, tmp_path)
+
+    try:
+        outcomes = await asyncio.gather(
+            client._query_osv([dep]), client._query_osv([dep]), return_exceptions=True
+        )
+    finally:
+        await client.close()
+
+    assert post.call_count == 1
+    assert all(isinstance(outcome, Exception) for outcome in outcomes)
+    assert client._osv_inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_query_osv_respects_host_gate_across_calls(
+    monkeypatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(config, "OSV_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(config, "OSV_CACHE_SIZE", 0)
+    client = AdvisoryClient()
+    replay = _ReplayPost(_FakeResponse({"results": [{}]}))
+    in_flight = 0
+    peak = 0
+
+    async def post(url: str, **kwargs: object) -> _FakeResponse:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return await replay(url, **kwargs)
+
+    monkeypatch.setattr(client._client, "post", post)
+    dep_a = Dependency("pypi", "pkg-a", "1.0.0", True, tmp_path)
+    dep_b = Dependency("pypi", "pkg-b", "1.0.0", True, tmp_path)
+
+    try:
+        await asyncio.gather(client._query_osv([dep_a]), client._query_osv([dep_b]))
+    finally:
+        await client.close()
+
+    assert replay.call_count == 2
+    assert peak == 1
+
+
+@pytest.mark.asyncio
+async def test_osv_batch_size_respects_config(monkeypatch, tmp_path: Path) -> None:
+    monkeypatch.setattr(config, "OSV_BATCH_SIZE", 1)
+    monkeypatch.setattr(config, "OSV_CACHE_SIZE", 0)
+    client = AdvisoryClient()
+    post = _ReplayPost(_FakeResponse({"results": [{}]}))
+    monkeypatch.setattr(client._client, "post", post)
 
     deps = [
         Dependency("pypi", f"pkg-{idx}", "1.0.0", True, tmp_path) for idx in range(3)
@@ -380,42 +1057,37 @@ async def test_osv_batch_size_respects_config(monkeypatch, tmp_path: Path) -> No
     finally:
         await client.close()
 
-    assert calls == 3
-    assert batch_lengths == [1, 1, 1]
+    assert post.call_count == 3
+    assert [len(payload["queries"]) for payload in post.payloads if payload] == [1, 1, 1]
 
 
 @pytest.mark.asyncio
 async def test_clear_cache_empties_entries(monkeypatch, tmp_path: Path) -> None:
     monkeypatch.setattr(config, "OSV_CACHE_SIZE", 8)
     client = AdvisoryClient()
-    calls = 0
-
-    async def fake_post(
-        url: str, *, json: dict | None = None, **_: object
-    ) -> _FakeResponse:
-        nonlocal calls
-        calls += 1
-        return _FakeResponse({"results": [{}]})
-
-    monkeypatch.setattr(client._client, "post", fake_post)
+    post = _ReplayPost(
+        _FakeResponse({"results": [{}]}),
+        _osv_hit("OSV-3", "9.1"),
+    )
+    monkeypatch.setattr(client._client, "post", post)
     dep = Dependency("pypi", "cached", "1.0.0", True, tmp_path)
 
     try:
-        await client._query_osv([dep])
+        assert await client._query_osv([dep]) == {dep.coordinate: []}
         client.clear_cache()
-        await client._query_osv([dep])
+        refreshed = await client._query_osv([dep])
     finally:
         await client.close()
 
-    assert calls == 2
+    assert post.call_count == 2
+    assert [advisory.identifier for advisory in refreshed[dep.coordinate]] == ["OSV-3"]
 
 
 @pytest.mark.asyncio
 async def test_fetch_advisories_deduplicates_and_merges(
-    monkeypatch, tmp_path: Path
+    advisory_client: AdvisoryClient, monkeypatch, tmp_path: Path
 ) -> None:
-    client = AdvisoryClient()
-    client._gh_token = uuid.uuid4().hex
+    advisory_client._gh_token = uuid.uuid4().hex
     dependency = Dependency("pypi", "demo", "1.0.0", True, tmp_path)
 
     osv_results: dict[str, list[Advisory]] = {
@@ -462,13 +1134,10 @@ async def test_fetch_advisories_deduplicates_and_merges(
     async def fake_gh(_: list[Dependency]) -> dict[str, list[Advisory]]:  # type: ignore[override]
         return gh_results
 
-    monkeypatch.setattr(client, "_query_osv", fake_osv)
-    monkeypatch.setattr(client, "_query_github", fake_gh)
+    monkeypatch.setattr(advisory_client, "_query_osv", fake_osv)
+    monkeypatch.setattr(advisory_client, "_query_github", fake_gh)
 
-    try:
-        merged = await client.fetch_advisories([dependency])
-    finally:
-        await client.close()
+    merged = await advisory_client.fetch_advisories([dependency])
 
     advisories = merged[dependency.coordinate]
     assert len(advisories) == 3
@@ -482,3 +1151,5 @@ async def test_fetch_advisories_deduplicates_and_merges(
         adv.source == "github" and adv.severity is Severity.CRITICAL
         for adv in advisories
     )
+    # Advisories without duplicates are copied, never handed out by identity.
+    assert not any(adv is gh_results[dependency.coordinate][1] for adv in advisories)
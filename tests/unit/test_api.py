@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import threading
 from pathlib import Path
 
 import pytest
 
-from rtx.api import _merge_dependency, scan_project_async
+from rtx.api import _merge_dependencies, _merge_dependency, scan_project_async
 from rtx.models import Dependency, PackageFinding
 
 
@@ -21,8 +22,10 @@ class _StubScanner:
         self.ecosystem = manager
         self._dependencies = list(dependencies)
         self._matches = matches
+        self.detected_on: list[str] = []
 
     def matches(self, _: Path) -> bool:
+        self.detected_on.append(threading.current_thread().name)
         return self._matches
 
     def scan(self, _: Path) -> list[Dependency]:
@@ -30,6 +33,9 @@ class _StubScanner:
 
 
 class _StubAdvisoryClient:
+    def __init__(self, **_: object) -> None:
+        return None
+
     async def __aenter__(self) -> _StubAdvisoryClient:
         return self
 
@@ -43,6 +49,9 @@ class _StubAdvisoryClient:
 
 
 class _StubPolicyEngine:
+    def __init__(self, **_: object) -> None:
+        return None
+
     async def __aenter__(self) -> _StubPolicyEngine:
         return self
 
@@ -59,6 +68,11 @@ class _StubPolicyEngine:
             dependency=dependency, advisories=[], signals=[], score=0.0
         )
 
+    async def analyze_many(
+        self, items: list[tuple[Dependency, list[object]]], *, concurrency: int = 1
+    ) -> list[PackageFinding]:
+        return [await self.analyze(dependency, advisories) for dependency, advisories in items]
+
 
 def test_merge_dependency_preserves_manifest_order(tmp_path: Path) -> None:
     first = Dependency(
@@ -94,6 +108,23 @@ def test_merge_dependency_preserves_manifest_order(tmp_path: Path) -> None:
     ]
 
 
+def test_merge_dependencies_folds_group_in_discovery_order(tmp_path: Path) -> None:
+    group = [
+        Dependency("npm", "demo", "1.0.0", False, tmp_path / f"{index}" / "package.json")
+        for index in range(3)
+    ]
+    group[1].metadata["manifests"] = ["extra", str(group[0].manifest)]
+
+    merged = _merge_dependencies(group)
+
+    assert merged.manifest == group[0].manifest
+    assert merged.direct is False
+    assert merged.metadata["manifests"] == [
+        *(str(dep.manifest) for dep in group),
+        "extra",
+    ]
+
+
 @pytest.mark.asyncio
 async def test_scan_project_async_preserves_manager_order(
     monkeypatch, tmp_path: Path
@@ -140,3 +171,23 @@ async def test_scan_project_async_preserves_manager_order(
         str(primary.manifest),
         str(duplicate.manifest),
     ]
+
+
+@pytest.mark.asyncio
+async def test_scan_project_async_detects_manifests_off_the_event_loop(
+    monkeypatch, tmp_path: Path
+) -> None:
+    dependency = Dependency("npm", "demo", "1.0.0", True, tmp_path / "package.json")
+    matching = _StubScanner("npm", [dependency])
+    skipped = _StubScanner("pypi", [dependency], matches=False)
+
+    monkeypatch.setattr("rtx.api.get_scanners", lambda _: [matching, skipped])
+    monkeypatch.setattr("rtx.api.AdvisoryClient", _StubAdvisoryClient)
+    monkeypatch.setattr("rtx.api.TrustPolicyEngine", _StubPolicyEngine)
+
+    report = await scan_project_async(tmp_path)
+
+    assert report.managers == ["npm"]
+    main_thread = threading.main_thread().name
+    assert matching.detected_on and main_thread not in matching.detected_on
+    assert skipped.detected_on and main_thread not in skipped.detected_on
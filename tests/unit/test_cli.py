@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import json
+from collections.abc import Iterator
+from datetime import datetime, timezone
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
 
 import pytest
 
-from rtx.cli import _report_from_payload, _resolve_output_path, main
+from rtx.cli import _get_parser, _report_from_payload, _resolve_output_path, main
 from rtx.exceptions import ReportRenderingError
 from rtx.models import (
     Advisory,
@@ -17,12 +20,16 @@ from rtx.models import (
     TrustSignal,
 )
 from rtx.system import ToolStatus
-from rtx.utils import utc_now
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None
 
-def test_resolve_output_path_table_defaults(tmp_path: Path) -> None:
+
+def test_resolve_output_path_table_defaults(shared_path: Path) -> None:
     assert _resolve_output_path("table", None) is None
-    path = tmp_path / "report.txt"
+    path = shared_path / "report.txt"
     assert _resolve_output_path("table", str(path)) == path
 
 
@@ -42,6 +49,10 @@ def test_resolve_output_path_rejects_stdout_for_html() -> None:
         _resolve_output_path("html", "-")
 
 
+# Fixed so the serialized sample reports are identical from run to run.
+_FROZEN_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
 def _sample_report(exit_code: int = 0) -> Report:
     dependency = Dependency(
         ecosystem="pypi",
@@ -86,7 +97,7 @@ def _sample_report(exit_code: int = 0) -> Report:
         path=Path("."),
         managers=["pypi"],
         findings=findings,
-        generated_at=utc_now(),
+        generated_at=_FROZEN_NOW,
         stats={
             "dependency_count": len(findings),
             "direct_dependencies": len([f for f in findings if f.dependency.direct]),
@@ -98,94 +109,153 @@ def _sample_report(exit_code: int = 0) -> Report:
     )
 
 
-@pytest.fixture(autouse=True)
-def mock_logging(monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setattr("rtx.cli._configure_logging", lambda level: None, raising=False)
+@pytest.fixture(scope="module")
+def clean_report() -> Report:
+    """Exit-code-0 report shared by the module; tests treat it as read-only."""
+    return _sample_report(exit_code=0)
 
 
-def test_scan_invokes_render(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: Any) -> None:
-    report = _sample_report(exit_code=0)
-    captured: dict[str, Any] = {}
+@pytest.fixture(scope="module")
+def risky_report() -> Report:
+    """Exit-code-2 report shared by the module; tests treat it as read-only."""
+    return _sample_report(exit_code=2)
 
-    monkeypatch.setattr(
-        "rtx.api.scan_project",
-        lambda path, managers=None: report,
-        raising=False,
-    )
+
+def _write_report_json(directory: Path, report: Report) -> Path:
+    payload = report.to_dict()
+    payload["summary"]["generated_at"] = report.generated_at.isoformat()
+    report_file = directory / "report.json"
+    if orjson is not None:
+        report_file.write_bytes(orjson.dumps(payload))
+    else:
+        report_file.write_text(json.dumps(payload), encoding="utf-8")
+    return report_file
+
+
+@pytest.fixture(scope="module")
+def clean_report_json(tmp_path_factory: pytest.TempPathFactory, clean_report: Report) -> Path:
+    """``clean_report`` serialized once; tests only read it, so they share the file."""
+    return _write_report_json(tmp_path_factory.mktemp("clean-report"), clean_report)
+
+
+@pytest.fixture(scope="module")
+def risky_report_json(tmp_path_factory: pytest.TempPathFactory, risky_report: Report) -> Path:
+    """``risky_report`` serialized once; tests only read it, so they share the file."""
+    return _write_report_json(tmp_path_factory.mktemp("risky-report"), risky_report)
+
+
+@pytest.fixture(scope="module")
+def shared_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Directory for tests whose paths are only passed through to stubs, never written."""
+    return tmp_path_factory.mktemp("cli")
+
+
+@pytest.fixture
+def cli_stubs(monkeypatch: pytest.MonkeyPatch) -> dict[str, Any]:
+    """Stub the scan pipeline: set ``["report"]`` to choose what ``rtx scan`` sees.
+
+    Table rendering is recorded in ``["captured"]`` and SBOM writes are dropped.
+    """
+    state: dict[str, Any] = {"report": None, "captured": {}}
+    monkeypatch.setattr("rtx.api.scan_project", lambda *_, **__: state["report"], raising=False)
     monkeypatch.setattr(
         "rtx.reporting.render_table",
-        lambda report_obj, console=None: captured.update({"fmt": "table"}),
+        lambda report_obj, console=None: state["captured"].update({"fmt": "table"}),
         raising=False,
     )
     monkeypatch.setattr("rtx.sbom.write_sbom", lambda *_, **__: None, raising=False)
+    return state
 
-    exit_code = main(["scan", "--path", str(tmp_path)])
-    assert exit_code == 0
-    assert captured == {"fmt": "table"}
-    captured_stdout = capsys.readouterr().out
-    assert "table" not in captured_stdout  # ensure our stub handled rendering
 
+@pytest.fixture
+def console_output(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Record what the CLI prints through ``_get_console()``, one entry per call."""
+    lines: list[str] = []
+    console = SimpleNamespace(print=lambda *objects, **_: lines.append(" ".join(map(str, objects))))
+    monkeypatch.setattr("rtx.cli._get_console", lambda: console, raising=False)
+    return lines
 
-def test_scan_rejects_unknown_format(tmp_path: Path, capsys: Any) -> None:
-    with pytest.raises(SystemExit) as exc:
-        main(["scan", "--path", str(tmp_path), "--format", "pdf"])
-    assert exc.value.code == 2
-    captured = capsys.readouterr()
-    assert "invalid choice" in captured.err
+
+@pytest.fixture(scope="module", autouse=True)
+def mock_logging() -> Iterator[None]:
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr("rtx.cli._configure_logging", lambda level: None, raising=False)
+        yield
+
+
+def test_scan_invokes_render(
+    cli_stubs: dict[str, Any], shared_path: Path, clean_report: Report
+) -> None:
+    cli_stubs["report"] = clean_report
+
+    exit_code = main(["scan", "--path", str(shared_path)])
+    assert exit_code == 0
+    assert cli_stubs["captured"] == {"fmt": "table"}
 
 
-def test_scan_unknown_manager(monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: Any) -> None:
+@pytest.mark.parametrize(
+    ("argv", "needle"),
+    [
+        pytest.param(
+            ["scan", "--manager", "foo"], "Unknown package manager(s): foo", id="scan-manager"
+        ),
+        pytest.param(
+            ["pre-upgrade", "--package", "requests", "--version", "2.32.0"],
+            "Unknown package manager(s): foo",
+            id="pre-upgrade-manager",
+        ),
+        pytest.param(["scan", "--format", "pdf"], "invalid choice", id="scan-format"),
+    ],
+)
+def test_main_error_paths(
+    monkeypatch: pytest.MonkeyPatch, shared_path: Path, capsys: Any, argv: list[str], needle: str
+) -> None:
     def fail(_path: Path, managers=None):
         raise ValueError("Unknown package manager(s): foo")
 
     monkeypatch.setattr("rtx.api.scan_project", fail, raising=False)
-    exit_code = main(["scan", "--path", str(tmp_path), "--manager", "foo"])
+    try:
+        exit_code = main([*argv, "--path", str(shared_path)])
+    except SystemExit as exc:  # argparse rejects bad choices before dispatch
+        exit_code = exc.code
     captured = capsys.readouterr()
     assert exit_code == 2
-    assert "Unknown package manager(s): foo" in captured.out
+    assert needle in captured.out + captured.err
 
 
 def test_scan_requires_output_for_json(
-    monkeypatch: pytest.MonkeyPatch,
-    tmp_path: Path,
-    capsys: Any,
+    cli_stubs: dict[str, Any],
+    shared_path: Path,
+    console_output: list[str],
+    clean_report: Report,
 ) -> None:
-    report = _sample_report(exit_code=0)
-    monkeypatch.setattr("rtx.api.scan_project", lambda *_: report, raising=False)
-    monkeypatch.setattr("rtx.reporting.render_table", lambda *_, **__: None, raising=False)
-    monkeypatch.setattr("rtx.sbom.write_sbom", lambda *_, **__: None, raising=False)
+    cli_stubs["report"] = clean_report
 
-    exit_code = main(["scan", "--path", str(tmp_path), "--format", "json"])
+    exit_code = main(["scan", "--path", str(shared_path), "--format", "json"])
 
-    captured = capsys.readouterr().out
     assert exit_code == 2
-    assert "JSON output requires --output path" in captured
+    assert "JSON output requires --output path" in "\n".join(console_output)
 
 
 def test_scan_writes_json_to_stdout(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: Any
+    cli_stubs: dict[str, Any], shared_path: Path, console_output: list[str], clean_report: Report
 ) -> None:
-    report = _sample_report(exit_code=0)
-    monkeypatch.setattr("rtx.api.scan_project", lambda *_: report, raising=False)
-    monkeypatch.setattr("rtx.sbom.write_sbom", lambda *_, **__: None, raising=False)
+    cli_stubs["report"] = clean_report
 
-    exit_code = main(["scan", "--path", str(tmp_path), "--format", "json", "--output", "-"])
+    exit_code = main(["scan", "--path", str(shared_path), "--format", "json", "--output", "-"])
 
     assert exit_code == 0
-    captured = capsys.readouterr().out
-    assert "pypi" in captured
-    assert '"summary"' in captured
+    payload = json.loads("\n".join(console_output))
+    assert payload["summary"]["managers"] == ["pypi"]
 
 
 def test_scan_signal_summary_flags(
-    monkeypatch: pytest.MonkeyPatch,
+    cli_stubs: dict[str, Any],
     tmp_path: Path,
-    capsys: Any,
+    console_output: list[str],
+    risky_report: Report,
 ) -> None:
-    report = _sample_report(exit_code=2)
-    monkeypatch.setattr("rtx.api.scan_project", lambda *_: report, raising=False)
-    monkeypatch.setattr("rtx.reporting.render_table", lambda *_, **__: None, raising=False)
-    monkeypatch.setattr("rtx.sbom.write_sbom", lambda *_, **__: None, raising=False)
+    cli_stubs["report"] = risky_report
 
     exit_code = main(
         [
@@ -199,26 +269,22 @@ def test_scan_signal_summary_flags(
     )
 
     assert exit_code == 2
-    captured = capsys.readouterr().out
-    assert "Signals: maintainer=1" in captured
+    assert "Signals: maintainer=1" in console_output
     summary_path = tmp_path / "summary.json"
     data = json.loads(summary_path.read_text(encoding="utf-8"))
     assert data["counts"]["maintainer"] == 1
 
 
 def test_scan_signal_summary_stdout(
-    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, capsys: Any
+    cli_stubs: dict[str, Any], shared_path: Path, console_output: list[str], risky_report: Report
 ) -> None:
-    report = _sample_report(exit_code=2)
-    monkeypatch.setattr("rtx.api.scan_project", lambda *_: report, raising=False)
-    monkeypatch.setattr("rtx.reporting.render_table", lambda *_, **__: None, raising=False)
-    monkeypatch.setattr("rtx.sbom.write_sbom", lambda *_, **__: None, raising=False)
+    cli_stubs["report"] = risky_report
 
     exit_code = main(
         [
             "scan",
             "--path",
-            str(tmp_path),
+            str(shared_path),
             "--show-signal-summary",
             "--signal-summary-output",
             "-",
@@ -226,21 +292,17 @@ def test_scan_signal_summary_stdout(
     )
 
     assert exit_code == 2
-    captured = capsys.readouterr().out
-    assert "Signals: maintainer=1" in captured
-    assert '"counts"' in captured
+    assert "Signals: maintainer=1" in console_output
+    assert json.loads(console_output[-1])["counts"] == {"maintainer": 1}
 
 
 def test_report_renders_from_json(
     monkeypatch: pytest.MonkeyPatch,
-    tmp_path: Path,
+    shared_path: Path,
     capsys: Any,
+    risky_report_json: Path,
 ) -> None:
-    report = _sample_report(exit_code=2)
-    payload = report.to_dict()
-    payload["summary"]["generated_at"] = report.generated_at.isoformat()
-    report_file = tmp_path / "report.json"
-    report_file.write_text(json.dumps(payload), encoding="utf-8")
+    report_file = risky_report_json
 
     captured: dict[str, Any] = {}
     monkeypatch.setattr(
@@ -262,7 +324,7 @@ def test_report_renders_from_json(
             "--format",
             "json",
             "--output",
-            str(tmp_path / "out.json"),
+            str(shared_path / "out.json"),
         ]
     )
     assert exit_code == 2
@@ -272,32 +334,23 @@ def test_report_renders_from_json(
 
 def test_report_requires_output_for_html(
     monkeypatch: pytest.MonkeyPatch,
-    tmp_path: Path,
-    capsys: Any,
+    console_output: list[str],
+    clean_report_json: Path,
 ) -> None:
-    report = _sample_report(exit_code=0)
-    payload = report.to_dict()
-    payload["summary"]["generated_at"] = report.generated_at.isoformat()
-    report_file = tmp_path / "report.json"
-    report_file.write_text(json.dumps(payload), encoding="utf-8")
+    report_file = clean_report_json
 
     exit_code = main(["report", str(report_file), "--format", "html"])
 
-    captured = capsys.readouterr().out
     assert exit_code == 2
-    assert "HTML output requires --output path" in captured
+    assert "HTML output requires --output path" in "\n".join(console_output)
 
 
 def test_report_signal_summary_flag(
     monkeypatch: pytest.MonkeyPatch,
-    tmp_path: Path,
-    capsys: Any,
+    console_output: list[str],
+    risky_report_json: Path,
 ) -> None:
-    report = _sample_report(exit_code=2)
-    payload = report.to_dict()
-    payload["summary"]["generated_at"] = report.generated_at.isoformat()
-    report_file = tmp_path / "report.json"
-    report_file.write_text(json.dumps(payload), encoding="utf-8")
+    report_file = risky_report_json
 
     monkeypatch.setattr("rtx.reporting.render", lambda *_, **__: None, raising=False)
 
@@ -312,51 +365,24 @@ def test_report_signal_summary_flag(
     )
 
     assert exit_code == 2
-    captured = capsys.readouterr().out
-    assert "Signals: maintainer=1" in captured
+    assert "Signals: maintainer=1" in console_output
 
 
-def test_report_missing_file(tmp_path: Path, capsys: Any) -> None:
-    exit_code = main(["report", str(tmp_path / "missing.json")])
-    captured = capsys.readouterr()
+def test_report_missing_file(shared_path: Path, console_output: list[str]) -> None:
+    exit_code = main(["report", str(shared_path / "missing.json")])
     assert exit_code == 4
-    assert "Failed to read report file" in captured.out
-
+    assert "Failed to read report file" in "\n".join(console_output)
 
-def test_pre_upgrade_unknown_manager(
-    monkeypatch: pytest.MonkeyPatch,
-    tmp_path: Path,
-    capsys: Any,
-) -> None:
-    def fail(_path: Path, managers=None):
-        raise ValueError("Unknown package manager(s): foo")
 
-    monkeypatch.setattr("rtx.api.scan_project", fail, raising=False)
-    exit_code = main(
-        [
-            "pre-upgrade",
-            "--path",
-            str(tmp_path),
-            "--package",
-            "requests",
-            "--version",
-            "2.32.0",
-        ]
-    )
-    captured = capsys.readouterr()
-    assert exit_code == 2
-    assert "Unknown package manager(s): foo" in captured.out
-
-
-def test_report_from_payload_roundtrip() -> None:
-    report = _sample_report(exit_code=2)
-    payload = report.to_dict()
-    payload["summary"]["generated_at"] = report.generated_at.isoformat()
+def test_report_from_payload_roundtrip(risky_report_json: Path) -> None:
+    payload = json.loads(risky_report_json.read_text(encoding="utf-8"))
     restored = _report_from_payload(payload)
     assert restored.exit_code() == 2
 
 
-def test_diagnostics_outputs_plain_text(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_diagnostics_outputs_plain_text(
+    monkeypatch: pytest.MonkeyPatch, console_output: list[str]
+) -> None:
     statuses = [
         ToolStatus(name="pip", available=True, path="/usr/bin/pip", version="pip 25"),
         ToolStatus(name="npm", available=False),
@@ -369,23 +395,18 @@ def test_diagnostics_outputs_plain_text(monkeypatch: pytest.MonkeyPatch) -> None
         raising=False,
     )
 
-    lines: list[str] = []
-
-    class DummyConsole:
-        def print(self, message: str) -> None:
-            lines.append(message)
-
-    monkeypatch.setattr("rtx.cli._get_console", lambda: DummyConsole(), raising=False)
-
     exit_code = main(["diagnostics"])
 
     assert exit_code == 1
-    assert any("pip" in line and "available" in line for line in lines)
-    assert any("npm" in line and "missing" in line for line in lines)
-    assert any("uv" in line and "error=timeout" in line for line in lines)
+    output = "\n".join(console_output)
+    assert "- pip: available (" in output
+    assert "- npm: missing (" in output
+    assert "- uv: available (path=/usr/bin/uv, error=timeout)" in output
 
 
-def test_diagnostics_json_output(monkeypatch: pytest.MonkeyPatch, capsys: Any) -> None:
+def test_diagnostics_json_output(
+    monkeypatch: pytest.MonkeyPatch, console_output: list[str]
+) -> None:
     statuses = [ToolStatus(name="pip", available=True, path="/usr/bin/pip", version="pip 25")]
 
     monkeypatch.setattr(
@@ -397,5 +418,13 @@ def test_diagnostics_json_output(monkeypatch: pytest.MonkeyPatch, capsys: Any) -
     exit_code = main(["diagnostics", "--json"])
 
     assert exit_code == 0
-    payload = json.loads(capsys.readouterr().out)
+    payload = json.loads("\n".join(console_output))
     assert payload["pip"]["available"] is True
+
+
+def test_main_reuses_the_parser(console_output: list[str]) -> None:
+    assert main(["list-managers"]) == 0
+    parser = _get_parser()
+    assert main(["list-managers"]) == 0
+    assert _get_parser() is parser
+    assert console_output
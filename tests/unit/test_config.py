@@ -1,63 +1,137 @@
 from __future__ import annotations
 
-import importlib
-import os
+from collections.abc import Iterator
 
 import pytest
 
 import rtx.config as config
 from rtx import __version__
 
+_HTTP_ENV = (
+    "RTX_HTTP_TIMEOUT",
+    "RTX_HTTP_RETRIES",
+    "RTX_HTTP_ATTEMPT_TIMEOUT",
+    "RTX_HTTP_MAX_CONNECTIONS",
+    "RTX_HTTP_MAX_KEEPALIVE_CONNECTIONS",
+    "RTX_HTTP_KEEPALIVE_EXPIRY",
+    "RTX_HTTP2",
+    "RTX_GITHUB_MAX_CONCURRENCY",
+    "RTX_OSV_BATCH_SIZE",
+    "RTX_OSV_CACHE_SIZE",
+    "RTX_OSV_MAX_CONCURRENCY",
+    "RTX_ADVISORY_CACHE_TTL",
+    "RTX_ADVISORY_DISK_CACHE",
+)
 
-def test_http_settings_respect_environment(monkeypatch: pytest.MonkeyPatch) -> None:
-    monkeypatch.setenv("RTX_HTTP_TIMEOUT", "12.5")
-    monkeypatch.setenv("RTX_HTTP_RETRIES", "5")
-    monkeypatch.setenv("RTX_GITHUB_MAX_CONCURRENCY", "12")
-    monkeypatch.setenv("RTX_OSV_BATCH_SIZE", "3")
-    monkeypatch.setenv("RTX_OSV_CACHE_SIZE", "42")
-    monkeypatch.setenv("RTX_OSV_MAX_CONCURRENCY", "9")
-    reloaded = importlib.reload(config)
-    assert reloaded.HTTP_TIMEOUT == pytest.approx(12.5)
-    assert reloaded.HTTP_RETRIES == 5
-    assert reloaded.GITHUB_MAX_CONCURRENCY == 12
-    assert reloaded.OSV_BATCH_SIZE == 3
-    assert reloaded.OSV_CACHE_SIZE == 42
-    assert reloaded.OSV_MAX_CONCURRENCY == 9
-
-    monkeypatch.delenv("RTX_HTTP_TIMEOUT", raising=False)
-    monkeypatch.delenv("RTX_HTTP_RETRIES", raising=False)
-    monkeypatch.delenv("RTX_GITHUB_MAX_CONCURRENCY", raising=False)
-    monkeypatch.delenv("RTX_OSV_BATCH_SIZE", raising=False)
-    monkeypatch.delenv("RTX_OSV_CACHE_SIZE", raising=False)
-    monkeypatch.delenv("RTX_OSV_MAX_CONCURRENCY", raising=False)
-    reloaded = importlib.reload(config)
-    assert reloaded.HTTP_TIMEOUT == pytest.approx(5.0)
-    assert reloaded.HTTP_RETRIES == 2
-    assert reloaded.GITHUB_MAX_CONCURRENCY == 6
-    assert reloaded.OSV_BATCH_SIZE == 18
-    assert reloaded.OSV_CACHE_SIZE == 512
-    assert reloaded.OSV_MAX_CONCURRENCY == 4
-    assert reloaded.USER_AGENT.startswith(f"rtx/{__version__}")
-
-
-def test_policy_concurrency_defaults_to_cpu(monkeypatch: pytest.MonkeyPatch) -> None:
-    original_cpu = os.cpu_count
+
+@pytest.fixture(autouse=True)
+def fresh_settings() -> Iterator[None]:
+    config.settings.cache_clear()
+    yield
+    config.settings.cache_clear()
+
+
+@pytest.mark.parametrize(
+    ("env", "expected"),
+    [
+        pytest.param(
+            {
+                "RTX_HTTP_TIMEOUT": "12.5",
+                "RTX_HTTP_RETRIES": "5",
+                "RTX_HTTP_ATTEMPT_TIMEOUT": "7.5",
+                "RTX_GITHUB_MAX_CONCURRENCY": "12",
+                "RTX_OSV_BATCH_SIZE": "3",
+                "RTX_OSV_CACHE_SIZE": "42",
+                "RTX_OSV_MAX_CONCURRENCY": "9",
+                "RTX_HTTP_MAX_CONNECTIONS": "8",
+                "RTX_HTTP_MAX_KEEPALIVE_CONNECTIONS": "4",
+                "RTX_HTTP2": "0",
+            },
+            {
+                "http_timeout": 12.5,
+                "http_retries": 5,
+                "http_attempt_timeout": 7.5,
+                "github_max_concurrency": 12,
+                "osv_batch_size": 3,
+                "osv_cache_size": 42,
+                "osv_max_concurrency": 9,
+                "http_max_connections": 8,
+                "http_max_keepalive_connections": 4,
+                "http2": False,
+            },
+            id="overrides",
+        ),
+        pytest.param(
+            {},
+            {
+                "http_timeout": 5.0,
+                "http_retries": 2,
+                "http_attempt_timeout": 30.0,
+                "github_max_concurrency": 6,
+                "osv_batch_size": 1000,
+                "osv_cache_size": 512,
+                "osv_max_concurrency": 4,
+                "http_max_connections": 100,
+                "http_max_keepalive_connections": 20,
+                "http_keepalive_expiry": 30.0,
+                "advisory_cache_ttl": 3600,
+                "advisory_disk_cache": False,
+            },
+            id="defaults",
+        ),
+    ],
+)
+def test_http_settings_respect_environment(
+    monkeypatch: pytest.MonkeyPatch, env: dict[str, str], expected: dict[str, object]
+) -> None:
+    for name in _HTTP_ENV:
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+
+    settings = config.settings()
+
+    assert {name: getattr(settings, name) for name in expected} == pytest.approx(expected)
+    assert config.USER_AGENT.startswith(f"rtx/{__version__}")
+
+
+def test_settings_are_cached_until_cleared(monkeypatch: pytest.MonkeyPatch) -> None:
+    settings = config.settings()
+    monkeypatch.setenv("RTX_HTTP_RETRIES", str(settings.http_retries + 1))
+    assert config.settings() is settings
+
+    config.settings.cache_clear()
+    assert config.settings().http_retries == settings.http_retries + 1
+
+
+def test_osv_batch_size_is_capped_at_api_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("RTX_OSV_BATCH_SIZE", "5000")
+    assert config.settings().osv_batch_size == config.OSV_MAX_BATCH_SIZE == 1000
+
+
+@pytest.mark.parametrize(
+    ("cpu_count", "expected"),
+    [
+        pytest.param(12, 12, id="reported"),
+        pytest.param(None, 4, id="unknown"),
+        pytest.param(0, 4, id="zero"),
+        pytest.param(64, 32, id="capped"),
+    ],
+)
+def test_policy_concurrency_defaults_to_cpu(
+    monkeypatch: pytest.MonkeyPatch, cpu_count: int | None, expected: int
+) -> None:
     monkeypatch.delenv("RTX_POLICY_CONCURRENCY", raising=False)
-    monkeypatch.setattr("os.cpu_count", lambda: 12)
-    reloaded = importlib.reload(config)
-    assert reloaded.DEFAULT_POLICY_CONCURRENCY == 12
-    assert reloaded.POLICY_ANALYSIS_CONCURRENCY == 12
-
-    monkeypatch.setattr("os.cpu_count", lambda: None)
-    reloaded = importlib.reload(config)
-    assert reloaded.DEFAULT_POLICY_CONCURRENCY == 4
-    assert reloaded.POLICY_ANALYSIS_CONCURRENCY == 4
-
-    monkeypatch.setattr("os.cpu_count", original_cpu)
-    reloaded = importlib.reload(config)
-    expected = original_cpu()
-    if expected is None or expected <= 0:
-        expected = 4
-    expected = max(1, min(32, expected))
-    assert reloaded.DEFAULT_POLICY_CONCURRENCY == expected
-    assert reloaded.POLICY_ANALYSIS_CONCURRENCY == expected
+    monkeypatch.setattr("os.cpu_count", lambda: cpu_count)
+
+    settings = config.settings()
+
+    assert settings.default_policy_concurrency == expected
+    assert settings.policy_analysis_concurrency == expected
+
+
+def test_module_constants_mirror_import_time_settings() -> None:
+    snapshot = config._SETTINGS
+    assert config.HTTP_TIMEOUT == snapshot.http_timeout
+    assert config.OSV_BATCH_SIZE == snapshot.osv_batch_size
+    assert config.GITHUB_DEFAULT_TOKEN_ENV == snapshot.github_default_token_env
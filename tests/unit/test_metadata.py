@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import FrozenInstanceError
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
 import pytest
 
+from rtx import config
 from rtx.metadata import MetadataClient, ReleaseMetadata, _dedupe_names, _parse_date
 from rtx.models import Dependency
 from rtx.utils import utc_now
@@ -38,6 +41,21 @@ def test_parse_date_supports_fractional_and_z_suffix() -> None:
     assert parsed.tzinfo is None
 
 
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("2024-09-19", datetime(2024, 9, 19)),
+        ("2024-09-19T12:34:56", datetime(2024, 9, 19, 12, 34, 56)),
+        ("2024-09-19T12:34:56.12Z", datetime(2024, 9, 19, 12, 34, 56, 120000)),
+        ("2024-09-19T23:30:00-01:00", datetime(2024, 9, 20, 0, 30)),
+        ("not a date", None),
+        ("  ", None),
+    ],
+)
+def test_parse_date_formats(value: str, expected: datetime | None) -> None:
+    assert _parse_date(value) == expected
+
+
 def test_dedupe_names_normalizes_and_trims() -> None:
     candidates = ["Alice", " alice ", "ALICE", None, "Bob", "bob", ""]
     assert _dedupe_names(candidates) == ["Alice", "Bob"]
@@ -53,8 +71,13 @@ def test_dedupe_names_preserves_order() -> None:
 
 def test_release_metadata_uses_slots() -> None:
     metadata = ReleaseMetadata(utc_now(), 1, 2, ["alice"], "pypi")
-    with pytest.raises(AttributeError):
-        metadata.extra = "value"  # type: ignore[attr-defined]
+    assert not hasattr(metadata, "__dict__")
+
+
+def test_release_metadata_is_frozen() -> None:
+    metadata = ReleaseMetadata(None, 0, 0, [], "pypi")
+    with pytest.raises(FrozenInstanceError):
+        metadata.total_releases = 1  # type: ignore[misc]
 
 
 @pytest.mark.asyncio
@@ -85,9 +108,30 @@ class _PassthroughRetry:
         return await task()
 
 
-def _client_with_transport(handler):
-    assert httpx is not None  # pragma: no cover - safety guard
-    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+class _Dispatcher:
+    """MockTransport handler that forwards to whatever the current test installs."""
+
+    def __init__(self) -> None:
+        self.handler: Callable[[httpx.Request], Awaitable[httpx.Response]] | None = None
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        assert self.handler is not None, "test did not install a handler"
+        return await self.handler(request)
+
+
+@pytest.fixture
+def dispatcher() -> _Dispatcher:
+    return _Dispatcher()
+
+
+@pytest.fixture
+async def metadata_client(dispatcher: _Dispatcher) -> AsyncIterator[MetadataClient]:
+    """A client wired straight to ``dispatcher``, so no real connection pool is built."""
+    transport = httpx.MockTransport(dispatcher)
+    async with httpx.AsyncClient(transport=transport) as http_client:
+        client = MetadataClient(client=http_client)
+        client._retry = _PassthroughRetry()
+        yield client
 
 
 @pytest.mark.asyncio
@@ -153,7 +197,42 @@ async def test_fetch_reuses_cache_for_same_package(monkeypatch, tmp_path: Path)
 
 
 @pytest.mark.asyncio
-async def test_fetch_pypi_parses_metadata(monkeypatch, tmp_path: Path) -> None:
+async def test_fetch_retries_a_stalled_attempt(tmp_path: Path) -> None:
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(10)
+        return json_response({"info": {"author": "alice"}, "releases": {}})
+
+    dependency = Dependency("pypi", "demo", "1.0.0", True, tmp_path)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+        client = MetadataClient(client=http_client, retries=1, attempt_timeout=0.05)
+        client._retry.delay = 0.0
+        metadata = await asyncio.wait_for(client.fetch(dependency), 5)
+
+    assert calls == 2
+    assert metadata.maintainers == ["alice"]
+
+
+@pytest.mark.asyncio
+async def test_client_bounds_each_attempt_by_default() -> None:
+    client = MetadataClient()
+    try:
+        assert client._retry.attempt_timeout == config.HTTP_ATTEMPT_TIMEOUT
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_fetch_pypi_parses_metadata(
+    monkeypatch,
+    tmp_path: Path,
+    metadata_client: MetadataClient,
+    dispatcher: _Dispatcher,
+) -> None:
     dependency = Dependency("pypi", "demo", "1.0.0", True, tmp_path)
     now = utc_now()
     older = now - timedelta(days=1)
@@ -186,14 +265,8 @@ async def test_fetch_pypi_parses_metadata(monkeypatch, tmp_path: Path) -> None:
             )
         return httpx.Response(404)
 
-    client = MetadataClient()
-    await client._client.aclose()
-    client._client = _client_with_transport(handler)
-    client._retry = _PassthroughRetry()
-    try:
-        metadata = await client._fetch_pypi(dependency)
-    finally:
-        await client.close()
+    dispatcher.handler = handler
+    metadata = await metadata_client._fetch_pypi(dependency)
 
     assert metadata.latest_release is not None
     assert metadata.latest_release.date() == now.date()
@@ -203,7 +276,10 @@ async def test_fetch_pypi_parses_metadata(monkeypatch, tmp_path: Path) -> None:
 
 @pytest.mark.asyncio
 async def test_fetch_gomod_tolerates_per_version_failures(
-    monkeypatch, tmp_path: Path
+    monkeypatch,
+    tmp_path: Path,
+    metadata_client: MetadataClient,
+    dispatcher: _Dispatcher,
 ) -> None:
     dependency = Dependency("go", "example.com/mod", "v1.0.0", True, tmp_path)
     now = utc_now().replace(microsecond=0)
@@ -217,14 +293,8 @@ async def test_fetch_gomod_tolerates_per_version_failures(
             return httpx.Response(404)
         return httpx.Response(500)
 
-    client = MetadataClient()
-    await client._client.aclose()
-    client._client = _client_with_transport(handler)
-    client._retry = _PassthroughRetry()
-    try:
-        metadata = await client._fetch_gomod(dependency)
-    finally:
-        await client.close()
+    dispatcher.handler = handler
+    metadata = await metadata_client._fetch_gomod(dependency)
 
     assert metadata.latest_release is not None
     assert metadata.latest_release >= now
@@ -234,7 +304,12 @@ async def test_fetch_gomod_tolerates_per_version_failures(
 
 
 @pytest.mark.asyncio
-async def test_fetch_npm_parses_metadata(monkeypatch, tmp_path: Path) -> None:
+async def test_fetch_npm_parses_metadata(
+    monkeypatch,
+    tmp_path: Path,
+    metadata_client: MetadataClient,
+    dispatcher: _Dispatcher,
+) -> None:
     dependency = Dependency("npm", "demo", "1.0.0", True, tmp_path)
     now = utc_now().isoformat()
 
@@ -254,14 +329,8 @@ async def test_fetch_npm_parses_metadata(monkeypatch, tmp_path: Path) -> None:
             )
         return httpx.Response(404)
 
-    client = MetadataClient()
-    await client._client.aclose()
-    client._client = _client_with_transport(handler)
-    client._retry = _PassthroughRetry()
-    try:
-        metadata = await client._fetch_npm(dependency)
-    finally:
-        await client.close()
+    dispatcher.handler = handler
+    metadata = await metadata_client._fetch_npm(dependency)
 
     assert metadata.latest_release is not None
     assert metadata.releases_last_30d >= 1
@@ -269,7 +338,12 @@ async def test_fetch_npm_parses_metadata(monkeypatch, tmp_path: Path) -> None:
 
 
 @pytest.mark.asyncio
-async def test_fetch_crates_parses_metadata(monkeypatch, tmp_path: Path) -> None:
+async def test_fetch_crates_parses_metadata(
+    monkeypatch,
+    tmp_path: Path,
+    metadata_client: MetadataClient,
+    dispatcher: _Dispatcher,
+) -> None:
     dependency = Dependency("crates", "demo", "1.0.0", True, tmp_path)
     now = utc_now().isoformat()
 
@@ -291,14 +365,8 @@ async def test_fetch_crates_parses_metadata(monkeypatch, tmp_path: Path) -> None
             )
         return httpx.Response(404)
 
-    client = MetadataClient()
-    await client._client.aclose()
-    client._client = _client_with_transport(handler)
-    client._retry = _PassthroughRetry()
-    try:
-        metadata = await client._fetch_crates(dependency)
-    finally:
-        await client.close()
+    dispatcher.handler = handler
+    metadata = await metadata_client._fetch_crates(dependency)
 
     assert metadata.latest_release is not None
     assert metadata.releases_last_30d == 1
@@ -307,7 +375,12 @@ async def test_fetch_crates_parses_metadata(monkeypatch, tmp_path: Path) -> None
 
 
 @pytest.mark.asyncio
-async def test_fetch_gomod_parses_metadata(monkeypatch, tmp_path: Path) -> None:
+async def test_fetch_gomod_parses_metadata(
+    monkeypatch,
+    tmp_path: Path,
+    metadata_client: MetadataClient,
+    dispatcher: _Dispatcher,
+) -> None:
     dependency = Dependency("go", "example.com/demo", "1.0.0", True, tmp_path)
     now = utc_now().isoformat()
     requested = []
@@ -325,14 +398,8 @@ async def test_fetch_gomod_parses_metadata(monkeypatch, tmp_path: Path) -> None:
             )
         return httpx.Response(404)
 
-    client = MetadataClient()
-    await client._client.aclose()
-    client._client = _client_with_transport(handler)
-    client._retry = _PassthroughRetry()
-    try:
-        metadata = await client._fetch_gomod(dependency)
-    finally:
-        await client.close()
+    dispatcher.handler = handler
+    metadata = await metadata_client._fetch_gomod(dependency)
 
     assert metadata.latest_release is not None
     assert metadata.releases_last_30d == 1
@@ -342,7 +409,12 @@ async def test_fetch_gomod_parses_metadata(monkeypatch, tmp_path: Path) -> None:
 
 
 @pytest.mark.asyncio
-async def test_fetch_gomod_respects_concurrency(monkeypatch, tmp_path: Path) -> None:
+async def test_fetch_gomod_respects_concurrency(
+    monkeypatch,
+    tmp_path: Path,
+    metadata_client: MetadataClient,
+    dispatcher: _Dispatcher,
+) -> None:
     dependency = Dependency("go", "example.com/concurrent", "1.0.0", True, tmp_path)
     requested: list[str] = []
     active = 0
@@ -365,22 +437,21 @@ async def test_fetch_gomod_respects_concurrency(monkeypatch, tmp_path: Path) ->
             async with lock:
                 active -= 1
 
-    client = MetadataClient()
-    await client._client.aclose()
-    client._client = _client_with_transport(handler)
-    client._retry = _PassthroughRetry()
+    dispatcher.handler = handler
     monkeypatch.setattr("rtx.config.GOMOD_METADATA_CONCURRENCY", 2, raising=False)
-    try:
-        await client._fetch_gomod(dependency)
-    finally:
-        await client.close()
+    await metadata_client._fetch_gomod(dependency)
 
     assert any(path.endswith("@v/list") for path in requested)
     assert max_active <= 2
 
 
 @pytest.mark.asyncio
-async def test_fetch_rubygems_parses_metadata(monkeypatch, tmp_path: Path) -> None:
+async def test_fetch_rubygems_parses_metadata(
+    monkeypatch,
+    tmp_path: Path,
+    metadata_client: MetadataClient,
+    dispatcher: _Dispatcher,
+) -> None:
     dependency = Dependency("rubygems", "demo", "1.0.0", True, tmp_path)
     now = utc_now()
 
@@ -397,14 +468,8 @@ async def test_fetch_rubygems_parses_metadata(monkeypatch, tmp_path: Path) -> No
             return json_response({"authors": "Alice, Bob"})
         return httpx.Response(404)
 
-    client = MetadataClient()
-    await client._client.aclose()
-    client._client = _client_with_transport(handler)
-    client._retry = _PassthroughRetry()
-    try:
-        metadata = await client._fetch_rubygems(dependency)
-    finally:
-        await client.close()
+    dispatcher.handler = handler
+    metadata = await metadata_client._fetch_rubygems(dependency)
 
     assert metadata.latest_release is not None
     assert metadata.releases_last_30d == 1
@@ -413,7 +478,12 @@ async def test_fetch_rubygems_parses_metadata(monkeypatch, tmp_path: Path) -> No
 
 
 @pytest.mark.asyncio
-async def test_fetch_maven_parses_metadata(monkeypatch, tmp_path: Path) -> None:
+async def test_fetch_maven_parses_metadata(
+    monkeypatch,
+    tmp_path: Path,
+    metadata_client: MetadataClient,
+    dispatcher: _Dispatcher,
+) -> None:
     dependency = Dependency("maven", "org.demo:demo", "1.0.0", True, tmp_path)
     now = utc_now()
     recent = int(now.timestamp() * 1000)
@@ -434,14 +504,8 @@ async def test_fetch_maven_parses_metadata(monkeypatch, tmp_path: Path) -> None:
             )
         return httpx.Response(404)
 
-    client = MetadataClient()
-    await client._client.aclose()
-    client._client = _client_with_transport(handler)
-    client._retry = _PassthroughRetry()
-    try:
-        metadata = await client._fetch_maven(dependency)
-    finally:
-        await client.close()
+    dispatcher.handler = handler
+    metadata = await metadata_client._fetch_maven(dependency)
 
     assert metadata.latest_release is not None
     assert metadata.releases_last_30d == 1
@@ -450,7 +514,12 @@ async def test_fetch_maven_parses_metadata(monkeypatch, tmp_path: Path) -> None:
 
 
 @pytest.mark.asyncio
-async def test_fetch_nuget_parses_metadata(monkeypatch, tmp_path: Path) -> None:
+async def test_fetch_nuget_parses_metadata(
+    monkeypatch,
+    tmp_path: Path,
+    metadata_client: MetadataClient,
+    dispatcher: _Dispatcher,
+) -> None:
     dependency = Dependency("nuget", "Demo.Package", "1.0.0", True, tmp_path)
     now = utc_now().isoformat()
 
@@ -482,14 +551,8 @@ async def test_fetch_nuget_parses_metadata(monkeypatch, tmp_path: Path) -> None:
             )
         return httpx.Response(404)
 
-    client = MetadataClient()
-    await client._client.aclose()
-    client._client = _client_with_transport(handler)
-    client._retry = _PassthroughRetry()
-    try:
-        metadata = await client._fetch_nuget(dependency)
-    finally:
-        await client.close()
+    dispatcher.handler = handler
+    metadata = await metadata_client._fetch_nuget(dependency)
 
     assert metadata.latest_release is not None
     assert metadata.releases_last_30d == 1
@@ -498,7 +561,12 @@ async def test_fetch_nuget_parses_metadata(monkeypatch, tmp_path: Path) -> None:
 
 
 @pytest.mark.asyncio
-async def test_fetch_packagist_parses_metadata(monkeypatch, tmp_path: Path) -> None:
+async def test_fetch_packagist_parses_metadata(
+    monkeypatch,
+    tmp_path: Path,
+    metadata_client: MetadataClient,
+    dispatcher: _Dispatcher,
+) -> None:
     dependency = Dependency("packagist", "vendor/demo", "1.0.0", True, tmp_path)
     now = utc_now().isoformat()
 
@@ -524,14 +592,8 @@ async def test_fetch_packagist_parses_metadata(monkeypatch, tmp_path: Path) -> N
             )
         return httpx.Response(404)
 
-    client = MetadataClient()
-    await client._client.aclose()
-    client._client = _client_with_transport(handler)
-    client._retry = _PassthroughRetry()
-    try:
-        metadata = await client._fetch_packagist(dependency)
-    finally:
-        await client.close()
+    dispatcher.handler = handler
+    metadata = await metadata_client._fetch_packagist(dependency)
 
     assert metadata.latest_release is not None
     assert metadata.releases_last_30d == 1
@@ -28,6 +28,22 @@ def _finding_with_signals(category: str, severity: Severity) -> PackageFinding:
     return PackageFinding(dependency=dependency, signals=[signal], score=0.0)
 
 
+def test_dependency_is_hashable_despite_metadata(tmp_path: Path) -> None:
+    first = Dependency("pypi", "demo", "1.0.0", True, tmp_path, {"license": "MIT"})
+    same = Dependency("pypi", "demo", "1.0.0", True, tmp_path, {"license": "MIT"})
+    other_metadata = Dependency("pypi", "demo", "1.0.0", True, tmp_path, {})
+    assert hash(first) == hash(same) == hash(other_metadata)
+    assert {first, same, other_metadata} == {first, other_metadata}
+    with pytest.raises(AttributeError):
+        first.version = "2.0.0"  # type: ignore[misc]
+
+
+def test_dependency_coordinate_is_precomputed(tmp_path: Path) -> None:
+    dependency = Dependency("pypi", "demo", "1.0.0", True, tmp_path)
+    assert dependency.coordinate == "pypi:demo@1.0.0"
+    assert "coordinate=" not in repr(dependency)
+
+
 def test_signal_summary_from_findings() -> None:
     findings = [
         _finding_with_signals("maintainer", Severity.MEDIUM),
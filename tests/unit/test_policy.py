@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from collections.abc import AsyncIterator, Awaitable, Callable
 from contextlib import asynccontextmanager
 from datetime import datetime
@@ -203,3 +204,28 @@ async def test_compromised_detection_is_case_insensitive(monkeypatch, tmp_path)
             if signal.category == "compromised-maintainer"
         )
         assert compromised.severity == Severity.CRITICAL
+
+
+@pytest.mark.asyncio
+async def test_analyze_many_bounds_concurrency_and_keeps_order(monkeypatch, tmp_path) -> None:
+    in_flight = 0
+    peak = 0
+
+    async def fake_fetch(_dep: Dependency) -> ReleaseMetadata:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return make_metadata(ecosystem="pypi")
+
+    dependencies = [
+        Dependency("pypi", f"pkg-{index}", "1.0.0", True, tmp_path) for index in range(5)
+    ]
+    async with policy_engine(monkeypatch, fake_fetch) as engine:
+        findings = await engine.analyze_many(
+            ((dependency, []) for dependency in dependencies), concurrency=2
+        )
+
+    assert [finding.dependency for finding in findings] == dependencies
+    assert peak == 2
@@ -128,6 +128,35 @@ def test_pypi_scanner_captures_markers_and_requested_extras(tmp_path: Path) -> N
     assert httpx.metadata["requires_extras"] == ["socks"]
 
 
+def test_pypi_scanner_skips_non_string_and_commented_requirements(tmp_path: Path) -> None:
+    project = tmp_path / "demo"
+    project.mkdir()
+    (project / "pyproject.toml").write_text(
+        textwrap.dedent(
+            """
+            [project]
+            name = "demo"
+            version = "0.1.0"
+            dependencies = [
+                "requests==2.31.0  # pinned for TLS fixes",
+                "# disabled-package==1.0.0",
+                "   ",
+                1,
+                "not a valid requirement!",
+            ]
+            """
+        ),
+        encoding="utf-8",
+    )
+
+    scanner = PyPIScanner()
+    packages = {dep.name: dep for dep in scanner.scan(project)}
+
+    assert set(packages) == {"requests", "not a valid requirement!"}
+    assert packages["requests"].version == "2.31.0"
+    assert packages["not a valid requirement!"].version == "*"
+
+
 def test_pypi_scanner_reads_poetry_groups(tmp_path: Path) -> None:
     project = tmp_path / "demo"
     project.mkdir()
@@ -1,18 +1,36 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Iterator
+import json
+import ssl
+import textwrap
+from collections.abc import Awaitable, Callable, Iterator
 from pathlib import Path
 
+import httpx
 import pytest
 
+from rtx import utils
 from rtx.scanners import common
 from rtx.utils import (
     AsyncRetry,
     Graph,
     chunked,
+    detect_files,
     env_flag,
+    gather_bounded,
     has_matching_file,
+    is_non_string_sequence,
+    load_json_resource,
+    load_yaml_resource,
+    multiline,
+    read_json,
+    read_yaml,
+    retry_after_seconds,
+    run_async,
+    safe_json_loads,
+    sha256_digest,
+    shared_ssl_context,
     slugify,
     unique_preserving_order,
 )
@@ -26,6 +44,80 @@ def test_normalize_version_handles_semver() -> None:
 
 def test_slugify() -> None:
     assert slugify("Real Tracker X") == "real-tracker-x"
+    assert slugify("  @Scope/Pkg__Name!! ") == "scope-pkg-name"
+    assert slugify("---") == ""
+    assert slugify("Caf\u00e9 Au-Lait") == "caf-au-lait"
+    assert slugify("\u212aelvin") == "kelvin"
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "\n    alpha\n      beta\n    gamma\n",
+        "\talpha\n\t  beta\n",
+        "  mixed\n\ttabs\n",
+        "    first\n   \n    last  \n",
+        "no indent\n  nested\n",
+        "   \n  \n",
+    ],
+)
+def test_multiline_matches_dedent(text: str) -> None:
+    assert multiline(text) == textwrap.dedent(text).strip()
+
+
+def test_sha256_digest_accepts_buffers() -> None:
+    expected = "2cf24dba5fb0a30e26e83b2ac5b9e29e1b161e5c1fa7425e73043362938b9824"
+    assert sha256_digest(b"hello") == expected
+    assert sha256_digest(bytearray(b"hello")) == expected
+    assert sha256_digest(memoryview(b"xhellox")[1:-1]) == expected
+
+
+def test_json_helpers_accept_bytes_and_text(tmp_path: Path) -> None:
+    manifest = tmp_path / "package.json"
+    manifest.write_bytes('{"name": "démo", "dependencies": {"left-pad": "1.3.0"}}'.encode())
+    assert read_json(manifest)["name"] == "démo"
+    assert safe_json_loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
+    assert safe_json_loads('{"a": null}') == {"a": None}
+
+
+def test_large_manifests_parse_from_mapped_bytes(tmp_path: Path) -> None:
+    packages = {f"pkg-{index}": f"{index}.0.0" for index in range(5000)}
+    manifest = tmp_path / "package-lock.json"
+    manifest.write_text(json.dumps({"name": "démo", "packages": packages}), encoding="utf-8")
+    assert manifest.stat().st_size >= utils._MMAP_THRESHOLD
+    loaded = read_json(manifest)
+    assert loaded["name"] == "démo"
+    assert loaded["packages"] == packages
+
+    lockfile = tmp_path / "pnpm-lock.yaml"
+    lockfile.write_text(
+        "name: démo\npackages:\n" + "".join(f"  pkg-{i}: '{i}.0.0'\n" for i in range(5000)),
+        encoding="utf-8",
+    )
+    data = read_yaml(lockfile)
+    assert data["name"] == "démo"
+    assert data["packages"] == packages
+
+
+def test_load_json_resource_reloads_when_file_changes(tmp_path: Path) -> None:
+    resource = tmp_path / "data.json"
+    resource.write_text('{"version": 1}', encoding="utf-8")
+    first = load_json_resource(resource)
+    assert load_json_resource(resource) is first
+
+    resource.write_text('{"version": 22}', encoding="utf-8")
+    assert load_json_resource(resource) == {"version": 22}
+
+
+def test_resource_cache_is_bounded(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(utils, "_RESOURCE_CACHE_SIZE", 2)
+    utils.clear_resource_cache()
+    for index in range(4):
+        resource = tmp_path / f"entry-{index}.yaml"
+        resource.write_text(f"index: {index}\n", encoding="utf-8")
+        assert load_yaml_resource(resource) == {"index": index}
+    assert len(utils._resource_cache) == 2
+    utils.clear_resource_cache()
 
 
 def test_graph_adds_nodes_and_edges(tmp_path: Path) -> None:
@@ -37,6 +129,17 @@ def test_graph_adds_nodes_and_edges(tmp_path: Path) -> None:
     assert graph.edge_count() == 1
 
 
+def test_graph_edge_count_tracks_only_new_edges() -> None:
+    graph = Graph()
+    for _ in range(3):
+        graph.add_edge("a", "b")
+        graph.add_edge("a", "c")
+        graph.add_edge("b", "c")
+    graph.add_edge("c", "a")
+    assert graph.edge_count() == 4
+    assert graph.edge_count() == sum(len(targets) for targets in graph.to_dict()["edges"].values())
+
+
 def test_graph_add_node_merges_metadata() -> None:
     graph = Graph()
     graph.add_node("pkg", {"direct": True})
@@ -44,6 +147,20 @@ def test_graph_add_node_merges_metadata() -> None:
     assert graph.to_dict()["nodes"]["pkg"] == {"direct": True, "ecosystem": "pypi"}
 
 
+def test_graph_edges_are_sorted_by_name() -> None:
+    graph = Graph()
+    graph.add_edge("root", "zeta")
+    graph.add_edge("root", "alpha")
+    graph.add_edge("alpha", "beta")
+    graph.add_edge("root", "mid")
+    graph.add_edge("root", "alpha")
+    assert graph.dependencies_of("root") == ["alpha", "mid", "zeta"]
+    assert graph.dependencies_of("zeta") == []
+    assert graph.dependencies_of("unknown") == []
+    assert graph.to_dict()["edges"] == {"root": ["alpha", "mid", "zeta"], "alpha": ["beta"]}
+    assert graph.edge_count() == 4
+
+
 def test_graph_dependencies_of_returns_copy() -> None:
     graph = Graph()
     graph.add_edge("root", "child")
@@ -67,6 +184,16 @@ def test_chunked_supports_iterables() -> None:
     assert chunks == [[0, 1], [2, 3], [4]]
 
 
+def test_chunked_slices_lists_without_aliasing() -> None:
+    values = [1, 2, 3, 4, 5]
+    chunks = list(chunked(values, 2))
+    assert chunks == [[1, 2], [3, 4], [5]]
+    chunks[0].append(99)
+    assert values == [1, 2, 3, 4, 5]
+    assert list(chunked((1, 2, 3), 2)) == [[1, 2], [3]]
+    assert list(chunked([], 3)) == []
+
+
 def test_unique_preserving_order_respects_key() -> None:
     values = ["Alpha", "beta", "ALPHA", "Beta", "gamma"]
     assert unique_preserving_order(values) == [
@@ -128,6 +255,165 @@ async def test_async_retry_propagates_unhandled_exception() -> None:
         await retry(task)
 
 
+def test_async_retry_backoff_strategies() -> None:
+    exponential = AsyncRetry(retries=5, delay=0.5, jitter=0.0, max_delay=3.0)
+    assert [exponential.backoff_delay(n) for n in range(1, 5)] == [0.5, 1.0, 2.0, 3.0]
+    linear = AsyncRetry(retries=5, delay=0.5, backoff="linear", jitter=0.0)
+    assert [linear.backoff_delay(n) for n in range(1, 4)] == [0.5, 1.0, 1.5]
+    jittered = AsyncRetry(retries=5, delay=1.0, jitter=0.2)
+    assert all(0.8 <= jittered.backoff_delay(1) <= 1.2 for _ in range(50))
+    with pytest.raises(ValueError):
+        AsyncRetry(retries=1, delay=1.0, jitter=1.5)
+
+
+def _status_error(status: int, retry_after: str | None = None) -> httpx.HTTPStatusError:
+    headers = {"Retry-After": retry_after} if retry_after is not None else {}
+    request = httpx.Request("POST", "https://api.example.test")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError("throttled", request=request, response=response)
+
+
+@pytest.mark.parametrize(
+    ("exc", "expected"),
+    [
+        pytest.param(_status_error(429, "2"), 2.0, id="seconds"),
+        pytest.param(_status_error(503, "Wed, 21 Oct 2015 07:28:00 GMT"), 0.0, id="past-date"),
+        pytest.param(_status_error(429, "soon"), None, id="unparseable"),
+        pytest.param(_status_error(429), None, id="missing"),
+        pytest.param(_status_error(500, "2"), None, id="other-status"),
+        pytest.param(RuntimeError("boom"), None, id="not-http"),
+    ],
+)
+def test_retry_after_seconds(exc: BaseException, expected: float | None) -> None:
+    assert retry_after_seconds(exc) == expected
+
+
+def test_async_retry_waits_at_least_retry_after() -> None:
+    retry = AsyncRetry(retries=2, delay=0.5, jitter=0.0, max_delay=3.0)
+    assert retry._retry_delay(1, _status_error(429, "2")) == 2.0
+    assert retry._retry_delay(1, _status_error(429, "600")) == 3.0
+    assert retry._retry_delay(3, _status_error(503, "0")) == 2.0
+    assert retry._retry_delay(1, _status_error(500, "2")) == 0.5
+
+
+@pytest.mark.asyncio
+async def test_async_retry_retries_throttled_responses() -> None:
+    attempts = 0
+    retry = AsyncRetry(retries=1, delay=0.0, jitter=0.0, exceptions=(httpx.HTTPError,))
+
+    async def task() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise _status_error(429, "0")
+        return "done"
+
+    assert await retry(task) == "done"
+    assert attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_async_retry_abandons_stalled_attempts() -> None:
+    attempts = 0
+    retry = AsyncRetry(retries=1, delay=0.0, jitter=0.0, attempt_timeout=0.01)
+
+    async def task() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            await asyncio.sleep(1)
+        return "recovered"
+
+    assert await retry(task) == "recovered"
+    assert attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_async_retry_map_bounds_concurrency_and_keeps_order() -> None:
+    retry = AsyncRetry(retries=1, delay=0.0, jitter=0.0, exceptions=(RuntimeError,))
+    active = 0
+    peak = 0
+    failed: set[int] = set()
+
+    def make(index: int) -> Callable[[], Awaitable[int]]:
+        async def task() -> int:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            try:
+                await asyncio.sleep(0.01 * (5 - index))
+                if index == 2 and index not in failed:
+                    failed.add(index)
+                    raise RuntimeError("transient")
+                return index
+            finally:
+                active -= 1
+
+        return task
+
+    assert await retry.map((make(i) for i in range(5)), concurrency=2) == [0, 1, 2, 3, 4]
+    assert peak <= 2
+    assert failed == {2}
+    with pytest.raises(ValueError):
+        await retry.map([], concurrency=0)
+
+
+@pytest.mark.asyncio
+async def test_gather_bounded_limits_concurrency_and_keeps_order() -> None:
+    active = 0
+    peak = 0
+
+    def make(index: int) -> Callable[[], Awaitable[int]]:
+        async def task() -> int:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01 * (4 - index))
+            active -= 1
+            return index
+
+        return task
+
+    assert await gather_bounded([make(i) for i in range(4)], concurrency=3) == [0, 1, 2, 3]
+    assert peak == 3
+    with pytest.raises(ValueError):
+        await gather_bounded([], concurrency=0)
+
+
+def test_is_non_string_sequence() -> None:
+    assert is_non_string_sequence([1, 2])
+    assert is_non_string_sequence((1,))
+    assert is_non_string_sequence(range(3))
+    assert not is_non_string_sequence("abc")
+    assert not is_non_string_sequence(b"abc")
+    assert not is_non_string_sequence(bytearray(b"abc"))
+    assert not is_non_string_sequence({"a": 1})
+    assert not is_non_string_sequence({1, 2})
+
+
+def test_shared_ssl_context_is_built_once() -> None:
+    context = shared_ssl_context()
+    assert isinstance(context, ssl.SSLContext)
+    assert context.verify_mode == ssl.CERT_REQUIRED
+    assert shared_ssl_context() is context
+
+
+@pytest.mark.asyncio
+async def test_http_client_accepts_brotli_when_available() -> None:
+    pytest.importorskip("brotli")
+    async with utils.build_http_client(timeout=1.0) as client:
+        assert "br" in client.headers["Accept-Encoding"]
+
+
+@pytest.mark.parametrize("use_uvloop", [True, False])
+def test_run_async_returns_coroutine_result(use_uvloop: bool) -> None:
+    async def compute() -> int:
+        await asyncio.sleep(0)
+        return 42
+
+    assert run_async(compute(), use_uvloop=use_uvloop) == 42
+
+
 def test_env_flag_strips_whitespace(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setenv("RTX_TEST_FLAG", "  TrUe  ")
     assert env_flag("RTX_TEST_FLAG") is True
@@ -272,3 +558,23 @@ def test_read_requirements_follows_include_directives(tmp_path: Path) -> None:
 
     assert result["requests"] == "2.31.0"
     assert result["rich"] == ">=13.0.0"
+
+
+def test_detect_files_combines_literal_and_glob_patterns(tmp_path: Path) -> None:
+    for name in ("App.csproj", "Lib.fsproj", "packages.lock.json", "README.md"):
+        (tmp_path / name).write_text("", encoding="utf-8")
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "Nested.csproj").write_text("", encoding="utf-8")
+
+    matches = detect_files(
+        tmp_path,
+        ["packages.lock.json", "*.csproj", "*.fsproj", "*.csproj", "src/*.csproj", "missing.txt"],
+    )
+
+    assert matches == [
+        tmp_path / "App.csproj",
+        tmp_path / "Lib.fsproj",
+        tmp_path / "packages.lock.json",
+        tmp_path / "src" / "Nested.csproj",
+    ]
+    assert detect_files(tmp_path / "absent", ["*.csproj"]) == []